@@ -0,0 +1,124 @@
+"""Vectorized batch engine: many Tic-Tac-Toe boards evaluated at once with NumPy.
+
+All games live in one int8 array of shape (N, n, n): 0 = empty, 1 / 2 = player.
+A step applies one move to every unfinished game, and wins are found with
+row / column / diagonal reductions over the whole batch instead of a Python
+loop per board.
+
+usage: python batch_engine.py [games] [size]   (benchmark vs headless TicTacToeGame)
+"""
+import sys
+import time
+from typing import Optional, Sequence
+
+import numpy as np
+
+from tic_toe_game import Board
+
+
+class BatchBoards:
+    def __init__(self, count: int, n: int):
+        if n < 3:
+            raise ValueError("Board size should be at least 3")
+        self.n = n
+        self.cells = np.zeros((count, n, n), dtype=np.int8)
+        self.to_move = np.ones(count, dtype=np.int8)   # player (1 / 2) to move in each game
+        self.winner = np.zeros(count, dtype=np.int8)   # 0 while nobody has won
+        self.moves = np.zeros(count, dtype=np.int16)
+        self._diag = np.arange(n)
+
+    @classmethod
+    def from_boards(cls, boards: Sequence[Board], symbols: Sequence[str]) -> "BatchBoards":
+        """Load Board positions; symbols[0] becomes player 1, symbols[1] player 2."""
+        batch = cls(len(boards), boards[0].n)
+        for i, board in enumerate(boards):
+            for p, symbol in enumerate(symbols, start=1):
+                batch.cells[i] += (np.array(board.grid, dtype=object) == symbol).astype(np.int8) * p
+        batch.moves[:] = (batch.cells != 0).reshape(len(boards), -1).sum(axis=1)
+        # player 1 moves first, so the parity of the move count tells who is next
+        batch.to_move[:] = np.where(batch.moves % 2 == 0, 1, 2)
+        for p in (1, 2):
+            batch.winner[batch.check_wins(p)] = p
+        return batch
+
+    def __len__(self) -> int:
+        return self.cells.shape[0]
+
+    @property
+    def done(self) -> np.ndarray:
+        return (self.winner != 0) | (self.moves == self.n * self.n)
+
+    def empty_mask(self) -> np.ndarray:
+        """(N, n, n) bool array of empty cells."""
+        return self.cells == 0
+
+    def check_wins(self, player: int) -> np.ndarray:
+        """(N,) bool: games where `player` owns a full row, column or diagonal."""
+        return self._full_lines(self.cells == player)
+
+    def _full_lines(self, owned: np.ndarray) -> np.ndarray:
+        d = self._diag
+        return (owned.all(axis=2).any(axis=1)
+                | owned.all(axis=1).any(axis=1)
+                | owned[:, d, d].all(axis=1)
+                | owned[:, d, self.n - 1 - d].all(axis=1))
+
+    def apply_moves(self, flat_cells: np.ndarray, active: Optional[np.ndarray] = None):
+        """Play flat_cells[i] (row * n + col) for the player to move in every active game."""
+        if active is None:
+            active = ~self.done
+        games = np.nonzero(active)[0]
+        rows, cols = np.divmod(flat_cells[games], self.n)
+        if (self.cells[games, rows, cols] != 0).any():
+            raise ValueError("Move on an occupied cell")
+        players = self.to_move[games]
+        self.cells[games, rows, cols] = players
+        self.moves[games] += 1
+        for p in (1, 2):
+            moved = games[players == p]
+            if len(moved):
+                won = self._full_lines(self.cells[moved] == p)
+                self.winner[moved[won]] = p
+        self.to_move[games] = 3 - players
+
+    def random_moves(self, rng: np.random.Generator) -> np.ndarray:
+        """One uniformly random empty cell (flat index) per game; -1 for full boards."""
+        keys = rng.random((len(self), self.n * self.n))
+        keys[~self.empty_mask().reshape(len(self), -1)] = -1.0
+        choice = keys.argmax(axis=1)
+        choice[keys.max(axis=1) < 0] = -1
+        return choice
+
+    def random_playouts(self, rng: np.random.Generator) -> np.ndarray:
+        """Finish every game with random moves. Returns winners (0 = draw)."""
+        while True:
+            active = ~self.done
+            if not active.any():
+                return self.winner.copy()
+            self.apply_moves(self.random_moves(rng), active)
+
+
+def _loop_random_games(games: int, n: int) -> float:
+    from tic_toe_game import PlayerFactory, Role, TicTacToeGame
+    players = [PlayerFactory.create_player("A", "X", Role.AI), PlayerFactory.create_player("B", "O", Role.AI)]
+    started = time.perf_counter()
+    for _ in range(games):
+        TicTacToeGame(n, players, headless=True).play()
+    return time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    started = time.perf_counter()
+    winners = BatchBoards(games, n).random_playouts(np.random.default_rng(0))
+    batch_seconds = time.perf_counter() - started
+
+    loop_games = min(games, 10_000)
+    loop_seconds = _loop_random_games(loop_games, n)
+
+    print(f"{games} random playouts on {n}x{n}: "
+          f"X {np.mean(winners == 1):.2%}  O {np.mean(winners == 2):.2%}  draw {np.mean(winners == 0):.2%}")
+    print(f"BatchBoards      : {games / batch_seconds:,.0f} games/s")
+    print(f"TicTacToeGame loop: {loop_games / loop_seconds:,.0f} games/s")
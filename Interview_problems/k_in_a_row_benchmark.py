@@ -0,0 +1,81 @@
+"""Benchmark: k-in-a-row win checks on big boards.
+
+Plays random games (k = 5, gomoku style) on 15x15 and 19x19 boards and times
+make_move and the win check separately for
+  - RunTracker (Board(track_lines=True)): incremental run lengths, O(1) per move
+  - KInARowWinningStrategy: rescans around the last move on an untracked board
+and make_move / unmake_move cycles on the tracked board (what tree search does).
+The tracker moves work from the check into make_move, so compare the totals: it is
+roughly break-even per played move; it pays off in search (O(1) unmake, score()).
+
+usage: python k_in_a_row_benchmark.py [games]
+"""
+import random
+import sys
+import time
+
+from tic_toe_game import Board, WinningStrategyManager
+
+
+def random_games(n: int, games: int, seed: int = 7):
+    rng = random.Random(seed)
+    cells = [(r, c) for r in range(n) for c in range(n)]
+    for _ in range(games):
+        order = cells[:]
+        rng.shuffle(order)
+        yield order
+
+
+def time_win_checks(n: int, k: int, games: int, track_lines: bool):
+    """Average (make_move, win check) seconds per move."""
+    manager = WinningStrategyManager()
+    clock = time.perf_counter
+    moves = 0
+    make_time = check_time = 0.0
+    for order in random_games(n, games):
+        board = Board(n, track_lines=track_lines, win_length=k)
+        for i, (r, c) in enumerate(order):
+            symbol = "XO"[i % 2]
+            t0 = clock()
+            board.make_move(r, c, symbol)
+            t1 = clock()
+            won = manager.is_winner(board, (r, c), symbol)
+            t2 = clock()
+            make_time += t1 - t0
+            check_time += t2 - t1
+            moves += 1
+            if won:
+                break
+    return make_time / moves, check_time / moves
+
+
+def time_make_unmake(n: int, k: int, games: int) -> float:
+    moves = 0
+    elapsed = 0.0
+    for order in random_games(n, games):
+        board = Board(n, track_lines=True, win_length=k)
+        players = (board.player_index("X"), board.player_index("O"))
+        started = time.perf_counter()
+        for i, (r, c) in enumerate(order):
+            board.make_move(r, c, "XO"[i % 2])
+            board.tracker.is_win(r, c, players[i % 2])
+        for r, c in reversed(order):
+            board.unmake_move(r, c)
+        elapsed += time.perf_counter() - started
+        moves += len(order)
+    return elapsed / moves
+
+
+if __name__ == "__main__":
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    k = 5
+    for n in (15, 19):
+        tracked_make, tracked_check = time_win_checks(n, k, games, track_lines=True)
+        scan_make, scan_check = time_win_checks(n, k, games, track_lines=False)
+        cycle = time_make_unmake(n, k, games)
+        print(f"{n}x{n}, {k} in a row, {games} random games (per move)")
+        print(f"  RunTracker             : make {tracked_make * 1e6:.2f}us  win check {tracked_check * 1e6:.2f}us  "
+              f"total {(tracked_make + tracked_check) * 1e6:.2f}us")
+        print(f"  KInARowWinningStrategy : make {scan_make * 1e6:.2f}us  win check {scan_check * 1e6:.2f}us  "
+              f"total {(scan_make + scan_check) * 1e6:.2f}us")
+        print(f"  make + unmake (tracked): {cycle * 1e6:.2f}us")
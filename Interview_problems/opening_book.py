@@ -0,0 +1,266 @@
+"""Solved-position opening book for small Tic-Tac-Toe boards.
+
+Generator (offline): walks the game tree from the empty board for `plies` moves,
+folds positions that are the same under the board's 8 symmetries (rotations +
+reflections) into one canonical key, solves every one exactly and writes a
+compact binary book.
+
+Reader (at startup): memory-maps the book; a lookup is one hash probe, so the
+perfect move for a book position costs O(1) instead of a search.
+
+Positions are stored relative to the side to move ("mine" / "theirs" bit masks),
+so the book does not depend on player symbols or on who moved first.
+
+file  = header (magic, version, n, k, slot count) + open addressing hash table
+slot  = key + 1 (0 = empty slot), best move (cell index in canonical orientation), value (1 win / 0 draw / -1 loss)
+
+usage: python opening_book.py --size 3            (whole game, instant)
+       python opening_book.py --size 4 --plies 4  (solves the 4x4 tree, a few minutes)
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+MAGIC = b"TTTB"
+VERSION = 1
+_HEADER = struct.Struct("<4sBBBI")
+_SLOT = struct.Struct("<QBb")
+_HASH_MULT = 0x9E3779B97F4A7C15
+_MASK64 = (1 << 64) - 1
+
+
+# where books are written by default and where OpeningBookStrategy looks for them
+BOOK_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def book_filename(n: int, k: int) -> str:
+    return f"opening_book_{n}x{n}_k{k}.bin"
+
+
+# -------------------------
+# Geometry
+# -------------------------
+def symmetries(n: int) -> List[List[int]]:
+    """8 cell permutations; transformed[j] = original[perm[j]]."""
+    maps = [
+        lambda r, c: (r, c),
+        lambda r, c: (c, n - 1 - r),
+        lambda r, c: (n - 1 - r, n - 1 - c),
+        lambda r, c: (n - 1 - c, r),
+        lambda r, c: (r, n - 1 - c),
+        lambda r, c: (n - 1 - r, c),
+        lambda r, c: (c, r),
+        lambda r, c: (n - 1 - c, n - 1 - r),
+    ]
+    perms = []
+    for f in maps:
+        perm = [0] * (n * n)
+        for r in range(n):
+            for c in range(n):
+                tr, tc = f(r, c)
+                perm[tr * n + tc] = r * n + c
+        perms.append(perm)
+    return perms
+
+
+def winning_lines(n: int, k: int) -> List[int]:
+    lines = []
+    for r in range(n):
+        for c in range(n):
+            for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                end_r, end_c = r + (k - 1) * dr, c + (k - 1) * dc
+                if 0 <= end_r < n and 0 <= end_c < n:
+                    lines.append(sum(1 << ((r + i * dr) * n + c + i * dc) for i in range(k)))
+    return lines
+
+
+class Geometry:
+    def __init__(self, n: int, k: int):
+        self.n = n
+        self.k = k
+        self.cells = n * n
+        self.perms = symmetries(n)
+        self.lines = winning_lines(n, k)
+        self.lines_through = [[line for line in self.lines if line >> i & 1] for i in range(self.cells)]
+
+    def _permute(self, mask: int, perm: Sequence[int]) -> int:
+        out = 0
+        for j, src in enumerate(perm):
+            if mask >> src & 1:
+                out |= 1 << j
+        return out
+
+    def canonical(self, mine: int, theirs: int) -> Tuple[int, int]:
+        """(smallest key over the 8 symmetries, index of that symmetry)."""
+        best_key, best_t = -1, 0
+        for t, perm in enumerate(self.perms):
+            key = self._permute(mine, perm) | self._permute(theirs, perm) << self.cells
+            if best_key < 0 or key < best_key:
+                best_key, best_t = key, t
+        return best_key, best_t
+
+    def has_line(self, mask: int) -> bool:
+        return any(mask & line == line for line in self.lines)
+
+
+# -------------------------
+# Solver / generator
+# -------------------------
+class Solver:
+    """Exact negamax over bit masks with a memo; values are for the side to move."""
+
+    def __init__(self, geometry: Geometry):
+        self.g = geometry
+        self.full = (1 << geometry.cells) - 1
+        self.memo: Dict[int, int] = {}
+
+    def winning_move(self, mine: int, theirs: int) -> int:
+        free = self.full & ~(mine | theirs)
+        while free:
+            bit = free & -free
+            free ^= bit
+            new = mine | bit
+            for line in self.g.lines_through[bit.bit_length() - 1]:
+                if new & line == line:
+                    return bit.bit_length() - 1
+        return -1
+
+    def solve(self, mine: int, theirs: int) -> int:
+        key = mine | theirs << self.g.cells
+        value = self.memo.get(key)
+        if value is not None:
+            return value
+        free = self.full & ~(mine | theirs)
+        if self.winning_move(mine, theirs) >= 0:
+            value = 1
+        elif free & (free - 1) == 0:
+            value = 0  # last empty cell cannot win -> draw
+        else:
+            value = -1
+            while free:
+                bit = free & -free
+                free ^= bit
+                value = max(value, -self.solve(theirs, mine | bit))
+                if value == 1:
+                    break
+        self.memo[key] = value
+        return value
+
+    def best_move(self, mine: int, theirs: int) -> Tuple[int, int]:
+        cell = self.winning_move(mine, theirs)
+        if cell >= 0:
+            return cell, 1
+        value = self.solve(mine, theirs)
+        free = self.full & ~(mine | theirs)
+        while free:
+            bit = free & -free
+            free ^= bit
+            if -self.solve(theirs, mine | bit) == value:
+                return bit.bit_length() - 1, value
+        raise ValueError("No legal move")
+
+
+def generate(n: int, k: int, plies: int) -> Dict[int, Tuple[int, int]]:
+    """canonical key -> (best move in canonical orientation, value) for positions up to plies deep."""
+    g = Geometry(n, k)
+    solver = Solver(g)
+    book = {}
+    frontier = {0}
+    for _ply in range(plies + 1):
+        next_frontier = set()
+        for key in frontier:
+            mine, theirs = key & solver.full, key >> g.cells
+            if g.has_line(theirs) or (mine | theirs) == solver.full:
+                continue  # game already over
+            book[key] = solver.best_move(mine, theirs)
+            free = solver.full & ~(mine | theirs)
+            while free:
+                bit = free & -free
+                free ^= bit
+                next_frontier.add(g.canonical(theirs, mine | bit)[0])
+        frontier = next_frontier
+    return book
+
+
+def write_book(path: str, n: int, k: int, entries: Dict[int, Tuple[int, int]]):
+    slots = 8
+    while slots < 2 * len(entries):
+        slots *= 2
+    table = bytearray(_SLOT.size * slots)
+    for key, (move, value) in entries.items():
+        slot = _slot_of(key, slots)
+        while _SLOT.unpack_from(table, slot * _SLOT.size)[0]:
+            slot = (slot + 1) & (slots - 1)
+        _SLOT.pack_into(table, slot * _SLOT.size, key + 1, move, value)
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, n, k, slots))
+        f.write(table)
+
+
+def _slot_of(key: int, slots: int) -> int:
+    return ((key * _HASH_MULT) & _MASK64) >> (64 - slots.bit_length() + 1)
+
+
+# -------------------------
+# Reader
+# -------------------------
+class OpeningBook:
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n, k, slots = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not an opening book")
+        self.n, self.k, self.slots = n, k, slots
+        self.geometry = Geometry(n, k)
+
+    def lookup(self, grid: List[list], symbol: object) -> Optional[Tuple[Tuple[int, int], int]]:
+        """((row, col), value) for the side playing `symbol`, or None if the position is not in the book."""
+        mine = theirs = 0
+        others = set()
+        for r, row in enumerate(grid):
+            for c, cell in enumerate(row):
+                if cell == 0:
+                    continue
+                if cell == symbol:
+                    mine |= 1 << (r * self.n + c)
+                else:
+                    theirs |= 1 << (r * self.n + c)
+                    others.add(cell)
+        if len(others) > 1:
+            return None  # book is for two players
+        key, t = self.geometry.canonical(mine, theirs)
+        slot = _slot_of(key, self.slots)
+        while True:
+            stored, move, value = _SLOT.unpack_from(self._mm, _HEADER.size + slot * _SLOT.size)
+            if stored == 0:
+                return None
+            if stored == key + 1:
+                return divmod(self.geometry.perms[t][move], self.n), value
+            slot = (slot + 1) & (self.slots - 1)
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a solved opening book")
+    parser.add_argument("--size", type=int, default=3)
+    parser.add_argument("--win-length", type=int, default=None)
+    parser.add_argument("--plies", type=int, default=None, help="book depth (default: whole game)")
+    parser.add_argument("--out", default=None, help="default: the book file next to this module")
+    args = parser.parse_args()
+
+    k = args.win_length or args.size
+    plies = args.size * args.size if args.plies is None else args.plies
+    started = time.perf_counter()
+    entries = generate(args.size, k, plies)
+    path = args.out or os.path.join(BOOK_DIR, book_filename(args.size, k))
+    write_book(path, args.size, k, entries)
+    print(f"{len(entries)} positions up to {plies} plies -> {path} "
+          f"({time.perf_counter() - started:.1f}s)", file=sys.stderr)
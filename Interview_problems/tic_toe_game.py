@@ -1,7 +1,15 @@
+import atexit
+import math
+import os
 import random
+import time
 from abc import ABC, abstractmethod
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 from enum import Enum
-from typing import List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
+
+from opening_book import BOOK_DIR, OpeningBook, book_filename
 
 
 class State(Enum):
@@ -13,23 +21,278 @@ class State(Enum):
 class Role(Enum):
     HUMAN = 'human'
     AI = 'ai'
+    ALPHA_BETA = 'alphabeta'
+    MCTS = 'mcts'
+    BOOK = 'book'
+
+
+# -------------------------
+# Incremental win tracking
+# -------------------------
+class WinTracker(ABC):
+    """Incremental win state kept by a Board; moves are added/removed as they are made/unmade.
+
+    Players are the Board's player indices (see Board.player_index), not symbols.
+    """
+
+    @abstractmethod
+    def add(self, row: int, col: int, player: int):
+        pass
+
+    @abstractmethod
+    def remove(self, row: int, col: int, player: int):
+        pass
+
+    @abstractmethod
+    def is_win(self, row: int, col: int, player: int) -> bool:
+        """Return True if the move at (row, col) won the game for player."""
+        pass
+
+    @abstractmethod
+    def score(self, player: int, opponent: int) -> int:
+        """Cheap heuristic of how good the position is for player (used by search)."""
+        pass
+
+    @abstractmethod
+    def clear(self):
+        pass
+
+
+class LineCounters(WinTracker):
+    """Per-player count of marks in every row, column and both diagonals.
+
+    Updated on every move, so "did the last move complete a line?" is O(1).
+    Layout of the per-player list: rows [0, n), columns [n, 2n), main diag 2n, anti diag 2n + 1.
+    """
+
+    def __init__(self, n: int):
+        self.n = n
+        self.counts = {}
+
+    def add(self, row: int, col: int, player: int):
+        n = self.n
+        counts = self.counts.get(player)
+        if counts is None:
+            counts = self.counts[player] = [0] * (2 * n + 2)
+        counts[row] += 1
+        counts[n + col] += 1
+        if row == col:
+            counts[2 * n] += 1
+        if row + col == n - 1:
+            counts[2 * n + 1] += 1
+
+    def remove(self, row: int, col: int, player: int):
+        n = self.n
+        counts = self.counts[player]
+        counts[row] -= 1
+        counts[n + col] -= 1
+        if row == col:
+            counts[2 * n] -= 1
+        if row + col == n - 1:
+            counts[2 * n + 1] -= 1
+
+    def is_win(self, row: int, col: int, player: int) -> bool:
+        n = self.n
+        counts = self.counts.get(player)
+        if counts is None:
+            return False
+        return (counts[row] == n or counts[n + col] == n
+                or (row == col and counts[2 * n] == n)
+                or (row + col == n - 1 and counts[2 * n + 1] == n))
+
+    def score(self, player: int, opponent: int) -> int:
+        # open lines: a line only one side occupies is worth count^2 to that side
+        mine = self.counts.get(player)
+        theirs = self.counts.get(opponent)
+        score = 0
+        for i in range(2 * self.n + 2):
+            m = mine[i] if mine else 0
+            t = theirs[i] if theirs else 0
+            if t == 0:
+                score += m * m
+            elif m == 0:
+                score -= t * t
+        return score
+
+    def clear(self):
+        # zero the per-player lists in place
+        zeros = (0,) * (2 * self.n + 2)
+        for counts in self.counts.values():
+            counts[:] = zeros
+
+
+class RunTracker(WinTracker):
+    """k-in-a-row tracking: run lengths per direction, updated in O(1) per move.
+
+    For every direction the length of a run is stored at both of its end cells. A new mark
+    joins the run ending next to it on each side (L + 1 + R), so only the two outer ends are
+    rewritten. Undo restores those two values from a stack in O(1), so moves must be taken
+    back in reverse order (what search does); anything else raises ValueError.
+    """
+
+    DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+    def __init__(self, n: int, k: int):
+        self.n = n
+        self.k = k
+        size = n * n
+        # neighbours per direction; off the board points at the sentinel cell `size`, never owned
+        before = [[(r - dr) * n + c - dc if 0 <= r - dr < n and 0 <= c - dc < n else size
+                   for r in range(n) for c in range(n)] for dr, dc in self.DIRECTIONS]
+        after = [[(r + dr) * n + c + dc if 0 <= r + dr < n and 0 <= c + dc < n else size
+                  for r in range(n) for c in range(n)] for dr, dc in self.DIRECTIONS]
+        self.owner = bytearray(size + 1)  # player index per cell, 0 = empty
+        self.runs = [[0] * (size + 1) for _ in self.DIRECTIONS]
+        self.won = bytearray(size)
+        self.sum_sq: Dict[int, int] = {}  # per player: sum of run length^2 (search heuristic)
+        self._undo: List[list] = []
+        # (runs, flat index step, before, after) per direction, unpacked once per move
+        self._dirs = [(self.runs[d], dr * n + dc, before[d], after[d])
+                      for d, (dr, dc) in enumerate(self.DIRECTIONS)]
+
+    def clear(self):
+        # reset in place, the buffers are reused
+        size = self.n * self.n
+        self.owner[:] = bytes(size + 1)
+        zeros = (0,) * (size + 1)
+        for runs in self.runs:
+            runs[:] = zeros
+        self.won[:] = bytes(size)
+        self.sum_sq.clear()
+        self._undo.clear()
+
+    def add(self, row: int, col: int, player: int):
+        owner = self.owner
+        idx = row * self.n + col
+        owner[idx] = player
+        saved = [idx]
+        gained = longest = 0
+        for runs, step, before, after in self._dirs:
+            cell = before[idx]
+            left = runs[cell] if owner[cell] == player else 0
+            cell = after[idx]
+            right = runs[cell] if owner[cell] == player else 0
+            total = left + 1 + right
+            # a run never wraps around an edge, so its ends are whole steps away
+            runs[idx - step * left] = total
+            runs[idx + step * right] = total
+            saved.append(left)
+            saved.append(right)
+            gained += total * total - left * left - right * right
+            if total > longest:
+                longest = total
+        self.won[idx] = longest >= self.k
+        sum_sq = self.sum_sq
+        sum_sq[player] = sum_sq.get(player, 0) + gained
+        saved.append(gained)
+        self._undo.append(saved)
+
+    def remove(self, row: int, col: int, player: int):
+        idx = row * self.n + col
+        undo = self._undo
+        if not undo or undo[-1][0] != idx:
+            raise ValueError("RunTracker takes moves back in reverse order only")
+        saved = undo.pop()
+        i = 1
+        for runs, step, _, _ in self._dirs:
+            left, right = saved[i], saved[i + 1]
+            i += 2
+            if left:
+                runs[idx - step * left] = left
+            if right:
+                runs[idx + step * right] = right
+        self.owner[idx] = 0
+        self.won[idx] = 0
+        self.sum_sq[player] -= saved[-1]
+
+    def is_win(self, row: int, col: int, player: int) -> bool:
+        idx = row * self.n + col
+        return self.owner[idx] == player and bool(self.won[idx])
+
+    def score(self, player: int, opponent: int) -> int:
+        return self.sum_sq.get(player, 0) - self.sum_sq.get(opponent, 0)
 
 
 # -------------------------
 # Board
 # -------------------------
 class Board:
-    def __init__(self, n: int):
+    """n x n board stored as one flat bytearray of player indices.
+
+    cells[row * n + col] is 0 for an empty cell, otherwise the index of the player's symbol in
+    `symbols` (symbols[0] is the empty marker 0). Moves can be taken back with unmake_move,
+    so search runs in place without copying the board per node.
+    """
+
+    __slots__ = ("n", "win_length", "cells", "symbols", "_symbol_index", "tracker",
+                 "_all_cells", "_empty_cells", "_empty_index")
+
+    def __init__(self, n: int, track_lines: bool = False, win_length: Optional[int] = None):
         self.n = n
-        # 0 means empty; otherwise store symbol (like 'X'/'O')
-        self.grid = [[0 for _ in range(n)] for __ in range(n)]
+        # marks in a row needed to win; n means a full row/column/diagonal
+        self.win_length = n if win_length is None else win_length
+        self.cells = bytearray(n * n)
+        self.symbols: List[object] = [0]
+        self._symbol_index: Dict[object, int] = {}
+        # optional incremental win tracker (O(1) win checks instead of scanning lines)
+        self.tracker: Optional[WinTracker] = self._create_tracker() if track_lines else None
+        # empty cells in a list + cell -> index map, so a move removes its cell in O(1)
+        self._all_cells = tuple((r, c) for r in range(n) for c in range(n))
+        self._empty_cells = list(self._all_cells)
+        self._empty_index = {cell: i for i, cell in enumerate(self._all_cells)}
+
+    def _create_tracker(self) -> WinTracker:
+        if self.win_length == self.n:
+            return LineCounters(self.n)
+        return RunTracker(self.n, self.win_length)
+
+    def _reset_empty_cells(self):
+        # refill the existing list and map (the cell tuples are shared, not rebuilt)
+        self._empty_cells[:] = self._all_cells
+        index = self._empty_index
+        for i, cell in enumerate(self._all_cells):
+            index[cell] = i
+
+    def _remove_empty_cell(self, cell: Tuple[int, int]):
+        i = self._empty_index.pop(cell)
+        last = self._empty_cells.pop()
+        if i < len(self._empty_cells):
+            self._empty_cells[i] = last
+            self._empty_index[last] = i
+
+    def player_index(self, symbol: object) -> int:
+        """Small integer used for symbol in `cells` and by the tracker (registered on first use)."""
+        index = self._symbol_index.get(symbol)
+        if index is None:
+            if len(self.symbols) > 255:
+                raise ValueError("Too many players for the board")
+            index = self._symbol_index[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        return index
+
+    def cell(self, row: int, col: int):
+        """Symbol at (row, col), 0 if empty."""
+        return self.symbols[self.cells[row * self.n + col]]
+
+    @property
+    def grid(self) -> Tuple[tuple, ...]:
+        """Read-only snapshot of the board as rows of symbols (0 = empty), built on demand.
+
+        Tuples, so writing through it (board.grid[r][c] = ...) raises TypeError instead of
+        being silently lost; use make_move / unmake_move.
+        """
+        n, symbols = self.n, self.symbols
+        return tuple(tuple(symbols[v] for v in self.cells[r * n:(r + 1) * n]) for r in range(n))
+
+    def occupied_symbols(self) -> set:
+        return {self.symbols[v] for v in set(self.cells) if v}
 
     def print_board(self):
         # print indices header
         header = "   " + " ".join(f"{i}" for i in range(self.n))
         print(header)
         for r in range(self.n):
-            row_str = f"{r}  " + " ".join(str(self.grid[r][c]) if self.grid[r][c] != 0 else "." for c in range(self.n))
+            row_str = f"{r}  " + " ".join(str(self.cell(r, c)) if self.cell(r, c) != 0 else "." for c in range(self.n))
             print(row_str)
         print()
 
@@ -37,24 +300,58 @@ class Board:
         return 0 <= row < self.n and 0 <= col < self.n and self.is_cell_empty(row, col)
 
     def is_cell_empty(self, row: int, col: int) -> bool:
-        return self.grid[row][col] == 0
+        return self.cells[row * self.n + col] == 0
 
     def make_move(self, row: int, col: int, symbol: str) -> bool:
         if not self.is_valid_move(row, col):
             return False
-        self.grid[row][col] = symbol
+        player = self._symbol_index.get(symbol) or self.player_index(symbol)
+        self.cells[row * self.n + col] = player
+        self._remove_empty_cell((row, col))
+        if self.tracker is not None:
+            self.tracker.add(row, col, player)
         return True
 
+    def unmake_move(self, row: int, col: int):
+        """Take back the move at (row, col) - lets search run on one board instead of copies."""
+        idx = row * self.n + col
+        player = self.cells[idx]
+        if player == 0:
+            raise ValueError(f"Cell ({row}, {col}) is already empty")
+        if self.tracker is not None:
+            self.tracker.remove(row, col, player)  # first: it may refuse (RunTracker, out of order)
+        self.cells[idx] = 0
+        self._empty_index[(row, col)] = len(self._empty_cells)
+        self._empty_cells.append((row, col))
+
+    def copy(self, track_lines: Optional[bool] = None) -> "Board":
+        if track_lines is None:
+            track_lines = self.tracker is not None
+        clone = Board(self.n, track_lines=track_lines, win_length=self.win_length)
+        for symbol in self.symbols[1:]:
+            clone.player_index(symbol)  # same indices in the copy
+        for idx, player in enumerate(self.cells):
+            if player:
+                clone.make_move(idx // self.n, idx % self.n, self.symbols[player])
+        return clone
+
     def clear_board(self):
-        self.grid = [[0 for _ in range(self.n)] for __ in range(self.n)]
+        # reset in place, the cell buffer is reused
+        self.cells[:] = bytes(len(self.cells))
+        self._reset_empty_cells()
+        if self.tracker is not None:
+            self.tracker.clear()
+
+    def empty_count(self) -> int:
+        return len(self._empty_cells)
+
+    def has_empty(self) -> bool:
+        """O(1) "is the board full?" check for search loops (get_empty_cells copies the list)."""
+        return bool(self._empty_cells)
 
     def get_empty_cells(self) -> List[Tuple[int, int]]:
-        empties = []
-        for r in range(self.n):
-            for c in range(self.n):
-                if self.grid[r][c] == 0:
-                    empties.append((r, c))
-        return empties
+        # no grid scan; order is not row-major once moves have been made
+        return list(self._empty_cells)
 
 
 # -------------------------
@@ -71,7 +368,7 @@ class RowWinningStrategy(WinningStrategy):
     def check_win(self, board: Board, last_move: Tuple[int, int], player_symbol: str) -> bool:
         row, _ = last_move
         for c in range(board.n):
-            if board.grid[row][c] != player_symbol:
+            if board.cell(row, c) != player_symbol:
                 return False
         return True
 
@@ -80,7 +377,7 @@ class ColWinningStrategy(WinningStrategy):
     def check_win(self, board: Board, last_move: Tuple[int, int], player_symbol: str) -> bool:
         _, col = last_move
         for r in range(board.n):
-            if board.grid[r][col] != player_symbol:
+            if board.cell(r, col) != player_symbol:
                 return False
         return True
 
@@ -92,7 +389,7 @@ class MainDiagWinningStrategy(WinningStrategy):
         if row != col:
             return False
         for i in range(board.n):
-            if board.grid[i][i] != player_symbol:
+            if board.cell(i, i) != player_symbol:
                 return False
         return True
 
@@ -104,23 +401,64 @@ class AntiDiagWinningStrategy(WinningStrategy):
         if row + col != board.n - 1:
             return False
         for i in range(board.n):
-            if board.grid[i][board.n - 1 - i] != player_symbol:
+            if board.cell(i, board.n - 1 - i) != player_symbol:
                 return False
         return True
 
 
+class KInARowWinningStrategy(WinningStrategy):
+    """Scans up to win_length - 1 cells each way from the last move, in all four directions."""
+
+    def check_win(self, board: Board, last_move: Tuple[int, int], player_symbol: str) -> bool:
+        row, col = last_move
+        n, k = board.n, board.win_length
+        for dr, dc in RunTracker.DIRECTIONS:
+            count = 1
+            for sign in (1, -1):
+                r, c = row + sign * dr, col + sign * dc
+                while 0 <= r < n and 0 <= c < n and board.cell(r, c) == player_symbol and count < k:
+                    count += 1
+                    r, c = r + sign * dr, c + sign * dc
+            if count >= k:
+                return True
+        return False
+
+
+class TrackedWinningStrategy(WinningStrategy):
+    """O(1) check using the board's incremental tracker (board must be created with track_lines)."""
+
+    def check_win(self, board: Board, last_move: Tuple[int, int], player_symbol: str) -> bool:
+        row, col = last_move
+        player = board.player_index(player_symbol)
+        return board.tracker.is_win(row, col, player)
+
+
 class WinningStrategyManager:
-    def __init__(self):
-        self.strategies: List[WinningStrategy] = [
+    def __init__(self, strategies: Optional[List[WinningStrategy]] = None):
+        # explicit strategies are always used; otherwise tracked boards take the O(1) path
+        # and the scanning strategies are the fallback
+        self.strategies = strategies
+        self.tracked_strategies: List[WinningStrategy] = [TrackedWinningStrategy()]
+        self.fallback_strategies: List[WinningStrategy] = [
             RowWinningStrategy(),
             ColWinningStrategy(),
             MainDiagWinningStrategy(),
             AntiDiagWinningStrategy()
         ]
+        self.k_in_a_row_strategies: List[WinningStrategy] = [KInARowWinningStrategy()]
+
+    def strategies_for(self, board: Board) -> List[WinningStrategy]:
+        if self.strategies is not None:
+            return self.strategies
+        if board.tracker is not None:
+            return self.tracked_strategies
+        if board.win_length < board.n:
+            return self.k_in_a_row_strategies
+        return self.fallback_strategies
 
     def is_winner(self, board: Board, last_move: Tuple[int, int], player_symbol: str) -> bool:
         # Check all strategies (they internally verify relevancy)
-        for strat in self.strategies:
+        for strat in self.strategies_for(board):
             if strat.check_win(board, last_move, player_symbol):
                 return True
         return False
@@ -135,6 +473,10 @@ class PlayerStrategy(ABC):
         """Should perform or return the move (row, col) that the player wants to make."""
         pass
 
+    def close(self):
+        """Release resources such as worker pools; TicTacToeGame.play calls it when the game ends."""
+        pass
+
 
 class HumanStrategy(PlayerStrategy):
     def make_move(self, board: Board, player: "Player") -> Tuple[int, int]:
@@ -160,10 +502,408 @@ class RandomAIStrategy(PlayerStrategy):
         return random.choice(empties)
 
 
+def _mcts_search(board: Board, symbols: Tuple[object, object], playouts: int,
+                 exploration: float, seed: int) -> Dict[Tuple[int, int], Tuple[int, float]]:
+    """One independent UCT tree (top level so root-parallel workers can run it).
+
+    Nodes live in flat arrays (an arena) indexed by node id instead of one object per node.
+    A node's children are allocated together, so they are the id range
+    [first_child, first_child + child_count). wins[i] is from the point of view of the player
+    who made the move leading to node i. Returns {root move: (visits, wins)}.
+    """
+    rng = random.Random(seed)
+    board = board.copy(track_lines=True)
+    n = board.n
+    players = (board.player_index(symbols[0]), board.player_index(symbols[1]))
+    parent = array('i', [-1])
+    move = array('i', [-1])
+    first_child = array('i', [0])
+    child_count = array('i', [0])
+    visits = array('i', [0])
+    wins = array('d', [0.0])
+    terminal = bytearray(1)
+
+    for _ in range(playouts):
+        node, side, depth = 0, 0, 0
+        played = []
+        winner = None
+        # selection
+        while child_count[node] and not terminal[node]:
+            log_parent = math.log(visits[node])
+            best, best_score = -1, -1.0
+            start = first_child[node]
+            for child in range(start, start + child_count[node]):
+                if visits[child] == 0:
+                    best = child
+                    break
+                score = wins[child] / visits[child] + exploration * math.sqrt(log_parent / visits[child])
+                if score > best_score:
+                    best, best_score = child, score
+            node = best
+            r, c = divmod(move[node], n)
+            board.make_move(r, c, symbols[side])
+            played.append((r, c))
+            if board.tracker.is_win(r, c, players[side]):
+                terminal[node] = 1
+                winner = side
+            elif not board.has_empty():
+                terminal[node] = 1
+            side, depth = 1 - side, depth + 1
+        # expansion: all children at once, then step into the first one
+        if not terminal[node] and (visits[node] or node == 0):
+            cells = board.get_empty_cells()
+            first_child[node] = len(move)
+            child_count[node] = len(cells)
+            for r, c in cells:
+                parent.append(node)
+                move.append(r * n + c)
+                first_child.append(0)
+                child_count.append(0)
+                visits.append(0)
+                wins.append(0.0)
+                terminal.append(0)
+            node = first_child[node]
+            r, c = divmod(move[node], n)
+            board.make_move(r, c, symbols[side])
+            played.append((r, c))
+            if board.tracker.is_win(r, c, players[side]):
+                terminal[node] = 1
+                winner = side
+            elif not board.has_empty():
+                terminal[node] = 1
+            side, depth = 1 - side, depth + 1
+        # random playout
+        if not terminal[node]:
+            cells = board.get_empty_cells()
+            rng.shuffle(cells)
+            for r, c in cells:
+                board.make_move(r, c, symbols[side])
+                played.append((r, c))
+                if board.tracker.is_win(r, c, players[side]):
+                    winner = side
+                    break
+                side = 1 - side
+        for r, c in reversed(played):
+            board.unmake_move(r, c)
+        # backpropagation: node at depth d was entered by side (d - 1) % 2
+        while node != -1:
+            visits[node] += 1
+            if winner is None:
+                wins[node] += 0.5
+            elif depth and winner == (depth - 1) % 2:
+                wins[node] += 1.0
+            node = parent[node]
+            depth -= 1
+
+    start = first_child[0]
+    return {divmod(move[child], n): (visits[child], wins[child])
+            for child in range(start, start + child_count[0])}
+
+
+class MCTSStrategy(PlayerStrategy):
+    """Monte Carlo Tree Search (UCT) for boards too big for exhaustive search.
+
+    Root parallelism: every worker process grows its own tree from the current position with
+    `playouts` playouts; root visit counts are summed and the most visited move is played.
+    The total playouts per move therefore scale with the number of workers (CPU cores).
+    `stats` holds playouts and playouts per second of the last move.
+
+    The worker pool is created on the first move and shut down by close() (also called at
+    the end of TicTacToeGame.play, on leaving a `with` block and at interpreter exit).
+    Inside processes that already run games in parallel (tournament.py) use workers=1.
+    """
+
+    def __init__(self, playouts: int = 1000, workers: Optional[int] = None,
+                 exploration: float = math.sqrt(2), seed: Optional[int] = None):
+        self.playouts = playouts
+        self.workers = workers or os.cpu_count() or 1
+        self.exploration = exploration
+        self._rng = random.Random(seed)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.stats = {}
+
+    def make_move(self, board: Board, player: "Player") -> Tuple[int, int]:
+        empties = board.get_empty_cells()
+        if not empties:
+            raise Exception("No moves left for AI")
+        symbols = board.occupied_symbols() - {player.symbol}
+        if len(symbols) > 1:
+            raise ValueError("MCTSStrategy supports two players only")
+        opponent = symbols.pop() if symbols else object()
+
+        started = time.perf_counter()
+        seeds = [self._rng.getrandbits(32) for _ in range(self.workers)]
+        args = (board, (player.symbol, opponent), self.playouts, self.exploration)
+        if self.workers == 1:
+            results = [_mcts_search(*args, seeds[0])]
+        else:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                atexit.register(self.close)
+            results = list(self._pool.map(_mcts_search, *zip(*[args + (seed,) for seed in seeds])))
+
+        totals: Dict[Tuple[int, int], int] = {}
+        for result in results:
+            for cell, (child_visits, _) in result.items():
+                totals[cell] = totals.get(cell, 0) + child_visits
+        elapsed = time.perf_counter() - started
+        playouts = self.playouts * self.workers
+        self.stats = {
+            "playouts": playouts,
+            "workers": self.workers,
+            "seconds": elapsed,
+            "playouts_per_second": playouts / elapsed if elapsed > 0 else 0.0,
+        }
+        return max(totals, key=totals.get)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+            atexit.unregister(self.close)
+
+    def __enter__(self) -> "MCTSStrategy":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _SearchTimeout(Exception):
+    pass
+
+
+class AlphaBetaStrategy(PlayerStrategy):
+    """Negamax alpha-beta search for two-player games.
+
+    - iterative deepening until the per-move time limit runs out (best move of the last
+      finished depth is played)
+    - Zobrist hashed transposition table of fixed size, depth-preferred replacement and
+      entries from older searches always replaceable
+    - move ordering: transposition table move, then history heuristic, then centre first
+    - `stats` holds node counts, reached depth and timing of the last move for tuning
+    """
+
+    WIN = 1_000_000
+    _EXACT, _LOWER, _UPPER = 0, 1, 2
+
+    def __init__(self, time_limit: float = 1.0, max_depth: Optional[int] = None,
+                 tt_bits: int = 20, seed: int = 2024):
+        self.time_limit = time_limit
+        self.max_depth = max_depth
+        self.tt_size = 1 << tt_bits
+        # allocated by _init_zobrist on the first move (and again only if the board size changes)
+        self._tt: Optional[List[Optional[tuple]]] = None
+        self._generation = 0
+        self._seed = seed
+        self._zobrist_n = 0
+        self.stats = {}
+
+    # ---- zobrist keys: one per (side, cell) plus side-to-move ----
+    def _init_zobrist(self, n: int):
+        if self._zobrist_n == n:
+            return
+        rng = random.Random(self._seed)
+        self._keys = [[rng.getrandbits(64) for _ in range(n * n)] for _side in range(2)]
+        self._side_key = rng.getrandbits(64)
+        self._zobrist_n = n
+        self._tt = [None] * self.tt_size  # entries hashed with the old keys are useless
+
+    def make_move(self, board: Board, player: "Player") -> Tuple[int, int]:
+        empties = board.get_empty_cells()
+        if not empties:
+            raise Exception("No moves left for AI")
+        n = board.n
+        symbols = board.occupied_symbols() - {player.symbol}
+        if len(symbols) > 1:
+            raise ValueError("AlphaBetaStrategy supports two players only")
+        # before the opponent has moved any symbol other than ours stands in for it
+        opponent = symbols.pop() if symbols else object()
+
+        self._init_zobrist(n)
+        self._board = board.copy(track_lines=True)
+        self._symbols = (player.symbol, opponent)
+        self._players = (self._board.player_index(player.symbol), self._board.player_index(opponent))
+        self._hash = 0
+        for idx, cell in enumerate(self._board.cells):
+            if cell:
+                self._hash ^= self._keys[0 if cell == self._players[0] else 1][idx]
+        self._history = {}
+        self._generation += 1
+        self._nodes = 0
+        self._tt_hits = 0
+        started = time.perf_counter()
+        self._deadline = started + self.time_limit
+
+        best_move, best_value, depth_done = empties[0], 0, 0
+        max_depth = len(empties) if self.max_depth is None else min(self.max_depth, len(empties))
+        for depth in range(1, max_depth + 1):
+            try:
+                value, move = self._search_root(depth)
+            except _SearchTimeout:
+                break
+            best_move, best_value, depth_done = move, value, depth
+            if abs(value) >= self.WIN - len(empties):
+                break  # forced result found, deeper search cannot change it
+
+        elapsed = time.perf_counter() - started
+        self.stats = {
+            "nodes": self._nodes,
+            "depth": depth_done,
+            "value": best_value,
+            "tt_hits": self._tt_hits,
+            "seconds": elapsed,
+            "nodes_per_second": self._nodes / elapsed if elapsed > 0 else 0.0,
+        }
+        return best_move
+
+    def _search_root(self, depth: int) -> Tuple[int, Tuple[int, int]]:
+        alpha, beta = -self.WIN - 1, self.WIN + 1
+        best_move = None
+        for move in self._ordered_moves(self._tt_move()):
+            value = self._child_value(move, 0, depth, alpha, beta, 0)
+            if value > alpha or best_move is None:
+                alpha, best_move = max(alpha, value), move
+        self._tt_store(depth, alpha, self._EXACT, best_move, 0)
+        return alpha, best_move
+
+    def _negamax(self, depth: int, alpha: int, beta: int, ply: int, side: int) -> int:
+        alpha_orig = alpha
+        entry = self._tt[self._hash & (self.tt_size - 1)]
+        tt_move = None
+        if entry is not None and entry[0] == self._hash:
+            self._tt_hits += 1
+            tt_move = entry[5]
+            if entry[1] >= depth:
+                value = self._from_tt(entry[2], ply)
+                flag = entry[3]
+                if flag == self._EXACT:
+                    return value
+                if flag == self._LOWER:
+                    alpha = max(alpha, value)
+                elif flag == self._UPPER:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+
+        best_value, best_move = -self.WIN - 1, None
+        for move in self._ordered_moves(tt_move):
+            value = self._child_value(move, side, depth, alpha, beta, ply)
+            if value > best_value:
+                best_value, best_move = value, move
+            if value > alpha:
+                alpha = value
+            if alpha >= beta:
+                self._history[move] = self._history.get(move, 0) + depth * depth
+                break
+
+        if best_value <= alpha_orig:
+            flag = self._UPPER
+        elif best_value >= beta:
+            flag = self._LOWER
+        else:
+            flag = self._EXACT
+        self._tt_store(depth, best_value, flag, best_move, ply)
+        return best_value
+
+    def _child_value(self, move: Tuple[int, int], side: int, depth: int,
+                     alpha: int, beta: int, ply: int) -> int:
+        # plays move for side, scores it from side's point of view, takes it back
+        self._nodes += 1
+        if self._nodes & 1023 == 0 and time.perf_counter() > self._deadline:
+            raise _SearchTimeout()
+        board = self._board
+        r, c = move
+        symbol = self._symbols[side]
+        key = self._keys[side][r * board.n + c] ^ self._side_key
+        board.make_move(r, c, symbol)
+        self._hash ^= key
+        try:
+            if board.tracker.is_win(r, c, self._players[side]):
+                return self.WIN - ply - 1
+            if not board.has_empty():
+                return 0
+            if depth <= 1:
+                return board.tracker.score(self._players[side], self._players[1 - side])
+            return -self._negamax(depth - 1, -beta, -alpha, ply + 1, 1 - side)
+        finally:
+            self._hash ^= key
+            board.unmake_move(r, c)
+
+    def _ordered_moves(self, tt_move: Optional[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        centre = (self._board.n - 1) / 2
+        history = self._history
+        moves = sorted(self._board.get_empty_cells(),
+                       key=lambda m: (-history.get(m, 0), abs(m[0] - centre) + abs(m[1] - centre)))
+        if tt_move is not None and tt_move in moves:
+            moves.remove(tt_move)
+            moves.insert(0, tt_move)
+        return moves
+
+    def _tt_move(self) -> Optional[Tuple[int, int]]:
+        entry = self._tt[self._hash & (self.tt_size - 1)]
+        return entry[5] if entry is not None and entry[0] == self._hash else None
+
+    def _tt_store(self, depth: int, value: int, flag: int, move, ply: int):
+        index = self._hash & (self.tt_size - 1)
+        entry = self._tt[index]
+        if entry is None or entry[4] != self._generation or depth >= entry[1]:
+            self._tt[index] = (self._hash, depth, self._to_tt(value, ply), flag, self._generation, move)
+
+    # win scores are stored relative to the node, not the root, so they stay valid at any ply
+    def _to_tt(self, value: int, ply: int) -> int:
+        if value > self.WIN // 2:
+            return value + ply
+        if value < -self.WIN // 2:
+            return value - ply
+        return value
+
+    def _from_tt(self, value: int, ply: int) -> int:
+        if value > self.WIN // 2:
+            return value - ply
+        if value < -self.WIN // 2:
+            return value + ply
+        return value
+
+
+class OpeningBookStrategy(PlayerStrategy):
+    """Perfect moves from a solved opening book (opening_book.py), search once out of book.
+
+    Books are looked up by board size and win length in book_dir and memory-mapped the
+    first time that board size is played; missing books just mean every move is searched.
+    """
+
+    def __init__(self, book_dir: Optional[str] = None, fallback: Optional[PlayerStrategy] = None):
+        self.book_dir = book_dir or BOOK_DIR
+        self.fallback = fallback or AlphaBetaStrategy()
+        self._books: Dict[Tuple[int, int], Optional[OpeningBook]] = {}
+        self.stats = {"book_moves": 0, "searched_moves": 0}
+
+    def _book_for(self, board: Board) -> Optional[OpeningBook]:
+        key = (board.n, board.win_length)
+        if key not in self._books:
+            path = os.path.join(self.book_dir, book_filename(*key))
+            self._books[key] = OpeningBook(path) if os.path.exists(path) else None
+        return self._books[key]
+
+    def make_move(self, board: Board, player: "Player") -> Tuple[int, int]:
+        book = self._book_for(board)
+        if book is not None:
+            hit = book.lookup(board.grid, player.symbol)
+            if hit is not None and board.is_valid_move(*hit[0]):
+                self.stats["book_moves"] += 1
+                return hit[0]
+        self.stats["searched_moves"] += 1
+        return self.fallback.make_move(board, player)
+
+
 # Strategy registry maps Role to the strategy class
 PLAYER_STRATEGY_REGISTRY = {
     Role.HUMAN: HumanStrategy,
-    Role.AI: RandomAIStrategy
+    Role.AI: RandomAIStrategy,
+    Role.ALPHA_BETA: AlphaBetaStrategy,
+    Role.MCTS: MCTSStrategy,
+    Role.BOOK: OpeningBookStrategy
 }
 
 
@@ -177,6 +917,10 @@ class Player:
         self.role = role
         self._strategy: Optional[PlayerStrategy] = None
 
+    def set_strategy(self, strategy: PlayerStrategy):
+        # use a configured strategy instance instead of the registry default for the role
+        self._strategy = strategy
+
     def get_strategy(self) -> PlayerStrategy:
         # Lazily instantiate the strategy for this player
         if self._strategy is None:
@@ -224,16 +968,19 @@ class PlayerFactory:
 # TicTacToe Game Controller
 # -------------------------
 class TicTacToeGame:
-    def __init__(self, size: int, players: List[Player]):
+    def __init__(self, size: int, players: List[Player], track_lines: bool = True,
+                 headless: bool = False, win_length: Optional[int] = None):
         if size < 3:
             raise ValueError("Board size should be at least 3")
+        if win_length is not None and not 3 <= win_length <= size:
+            raise ValueError("Win length should be between 3 and the board size")
         if len(players) < 2:
             raise ValueError("At least two players required")
         if len(players) > size * size:
             raise ValueError("Too many players for the board")
 
         self.n = size
-        self.board = Board(size)
+        self.board = Board(size, track_lines=track_lines, win_length=win_length)
         self.players = players
         self.state = State.PROGRESS
         self.winner: Optional[Player] = None
@@ -241,6 +988,9 @@ class TicTacToeGame:
         self.total_moves = size * size
         self.winning_manager = WinningStrategyManager()
         self.current_player_index = 0
+        # headless: no printing/notifications, errors are raised (bulk simulation)
+        self.headless = headless
+        self.move_latencies: List[float] = []  # seconds spent in each strategy.make_move
         self._validate_unique_symbols()
 
     def _validate_unique_symbols(self):
@@ -255,19 +1005,38 @@ class TicTacToeGame:
         for p in self.players:
             p.notify(msg)
 
+    def _announce(self, msg: str):
+        if not self.headless:
+            self.notify_all(msg)
+            self.board.print_board()
+
     def play(self):
+        try:
+            self._play()
+        finally:
+            # e.g. MCTS worker pools; a strategy creates them again if it plays another game
+            for player in self.players:
+                player.get_strategy().close()
+
+    def _play(self):
         # Play until win or draw
         while self.state == State.PROGRESS and self.moves < self.total_moves:
             player = self.players[self.current_player_index]
             strategy = player.get_strategy()
+            started = time.perf_counter()
             try:
                 row, col = strategy.make_move(self.board, player)
             except Exception as e:
+                if self.headless:
+                    raise
                 print("Error making move:", e)
                 return
+            self.move_latencies.append(time.perf_counter() - started)
 
             successful = self.board.make_move(row, col, player.symbol)
             if not successful:
+                if self.headless:
+                    raise ValueError(f"{player.name} made an invalid move {(row, col)}")
                 # If strategy gave invalid move (shouldn't happen for our strategies), ask again
                 print("The move was invalid. Asking player to retry.")
                 continue
@@ -277,13 +1046,11 @@ class TicTacToeGame:
             if self.winning_manager.is_winner(self.board, (row, col), player.symbol):
                 self.state = State.WON
                 self.winner = player
-                self.notify_all(f"{player.name} ({player.symbol}) has won the game!")
-                self.board.print_board()
+                self._announce(f"{player.name} ({player.symbol}) has won the game!")
                 return
             elif self.moves == self.total_moves:
                 self.state = State.DRAW
-                self.notify_all("Game is a draw!")
-                self.board.print_board()
+                self._announce("Game is a draw!")
                 return
             else:
                 # Continue game
@@ -292,8 +1059,7 @@ class TicTacToeGame:
         # If loop ends unexpectedly
         if self.state == State.PROGRESS:
             self.state = State.DRAW
-            self.notify_all("Game ended — draw by exhaustion.")
-            self.board.print_board()
+            self._announce("Game ended — draw by exhaustion.")
 
 
 # -------------------------
@@ -323,7 +1089,7 @@ def main():
     # Let's create two players
     for i in range(2):
         while True:
-            raw = input(f"Enter player {i+1} as: name symbol role(human/ai) (e.g. Alice X human): ").strip().split()
+            raw = input(f"Enter player {i+1} as: name symbol role({'/'.join(r.value for r in Role)}) (e.g. Alice X human): ").strip().split()
             if len(raw) != 3:
                 print("Invalid input. Provide exactly three tokens.")
                 continue
@@ -338,7 +1104,7 @@ def main():
             try:
                 role = Role(role_str.lower())
             except ValueError:
-                print("Role must be 'human' or 'ai'.")
+                print("Role must be one of: " + ", ".join(f"'{r.value}'" for r in Role) + ".")
                 continue
 
             player = PlayerFactory.create_player(name, symbol, role)
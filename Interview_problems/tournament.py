@@ -0,0 +1,178 @@
+"""Headless self-play / tournament runner for the Tic-Tac-Toe LLD.
+
+Plays many games between two registered player strategies with no I/O
+(TicTacToeGame(headless=True)), split into chunks over a ProcessPoolExecutor.
+Every chunk gets its own seed derived from (seed, chunk index), so a run is
+reproducible no matter how chunks are scheduled on the workers.
+
+Reports win/draw rates, games per second and per-move latency percentiles.
+
+usage: python tournament.py ai alphabeta --games 1000 --size 3
+"""
+import argparse
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
+
+from tic_toe_game import PLAYER_STRATEGY_REGISTRY, Player, PlayerFactory, Role, TicTacToeGame
+
+# a strategy is given as a Role (registry default) or (Role, constructor kwargs)
+StrategySpec = Union[Role, Tuple[Role, dict]]
+
+
+# -------------------------
+# Latency histogram
+# -------------------------
+class LatencyHistogram:
+    """Log-scale histogram (8 buckets per doubling from 100ns): small, and merges exactly."""
+
+    BASE = 1e-7
+    STEPS_PER_DOUBLING = 8
+
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, seconds: float):
+        bucket = max(0, int(math.log2(max(seconds, self.BASE) / self.BASE) * self.STEPS_PER_DOUBLING))
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += seconds
+
+    def merge(self, other: "LatencyHistogram"):
+        for bucket, count in other.buckets.items():
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + count
+        self.count += other.count
+        self.total += other.total
+
+    def percentile(self, p: float) -> float:
+        """Upper bound (seconds) of the bucket holding the p-th percentile."""
+        if not self.count:
+            return 0.0
+        target = p / 100 * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= target:
+                return self.BASE * 2 ** ((bucket + 1) / self.STEPS_PER_DOUBLING)
+        return self.BASE * 2 ** ((max(self.buckets) + 1) / self.STEPS_PER_DOUBLING)
+
+
+# -------------------------
+# Result
+# -------------------------
+class TournamentResult:
+    def __init__(self, names: List[str]):
+        self.names = names
+        self.games = 0
+        self.wins = {name: 0 for name in names}
+        self.draws = 0
+        self.latency = {name: LatencyHistogram() for name in names}
+        self.seconds = 0.0
+
+    def merge(self, other: "TournamentResult"):
+        self.games += other.games
+        self.draws += other.draws
+        for name in self.names:
+            self.wins[name] += other.wins[name]
+            self.latency[name].merge(other.latency[name])
+
+    def summary(self) -> str:
+        lines = [f"games: {self.games}  time: {self.seconds:.2f}s  "
+                 f"games/s: {self.games / self.seconds if self.seconds else 0:.0f}"]
+        for name in self.names:
+            hist = self.latency[name]
+            lines.append(
+                f"{name:>12}: win {self.wins[name] / max(1, self.games):6.2%}  "
+                f"move latency p50 {hist.percentile(50) * 1e6:.1f}us  "
+                f"p90 {hist.percentile(90) * 1e6:.1f}us  p99 {hist.percentile(99) * 1e6:.1f}us")
+        lines.append(f"{'draw':>12}: {self.draws / max(1, self.games):6.2%}")
+        return "\n".join(lines)
+
+
+# -------------------------
+# Worker side
+# -------------------------
+def _make_player(name: str, symbol: str, spec: StrategySpec) -> Player:
+    role, kwargs = spec if isinstance(spec, tuple) else (spec, {})
+    if role == Role.MCTS and "workers" not in kwargs:
+        # games already run in parallel: a cpu_count-sized pool per worker would oversubscribe
+        kwargs = dict(kwargs, workers=1)
+    player = PlayerFactory.create_player(name, symbol, role)
+    player.set_strategy(PLAYER_STRATEGY_REGISTRY[role](**kwargs))
+    return player
+
+
+def _play_chunk(size: int, spec_a: StrategySpec, spec_b: StrategySpec, names: List[str],
+                first_game: int, games: int, seed: int) -> TournamentResult:
+    # strategies draw from the module level `random`, so seed it for this chunk
+    random.seed(seed)
+    players = [_make_player(names[0], "X", spec_a), _make_player(names[1], "O", spec_b)]
+    result = TournamentResult(names)
+    for i in range(first_game, first_game + games):
+        # alternate who moves first
+        order = players if i % 2 == 0 else players[::-1]
+        game = TicTacToeGame(size, order, headless=True)
+        game.play()
+        result.games += 1
+        if game.winner is None:
+            result.draws += 1
+        else:
+            result.wins[game.winner.name] += 1
+        for move, latency in enumerate(game.move_latencies):
+            result.latency[order[move % 2].name].add(latency)
+    return result
+
+
+# -------------------------
+# Runner
+# -------------------------
+def run_tournament(spec_a: StrategySpec, spec_b: StrategySpec, games: int, size: int = 3,
+                   workers: Optional[int] = None, chunk_size: int = 1000,
+                   seed: int = 0) -> TournamentResult:
+    role_a = spec_a[0] if isinstance(spec_a, tuple) else spec_a
+    role_b = spec_b[0] if isinstance(spec_b, tuple) else spec_b
+    names = [f"A:{role_a.value}", f"B:{role_b.value}"]
+    chunks = [(start, min(chunk_size, games - start)) for start in range(0, games, chunk_size)]
+    args = [(size, spec_a, spec_b, names, start, count, (seed << 32) + index)
+            for index, (start, count) in enumerate(chunks)]
+
+    result = TournamentResult(names)
+    started = time.perf_counter()
+    if workers == 1:
+        for a in args:
+            result.merge(_play_chunk(*a))
+    else:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            for chunk_result in pool.map(_play_chunk, *zip(*args)):
+                result.merge(chunk_result)
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless Tic-Tac-Toe tournament")
+    roles = [r.value for r in Role if r != Role.HUMAN]
+    parser.add_argument("player_a", choices=roles)
+    parser.add_argument("player_b", choices=roles)
+    parser.add_argument("--games", type=int, default=100_000)
+    parser.add_argument("--size", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--time-limit", type=float, default=None,
+                        help="per-move time limit for search based strategies")
+    args = parser.parse_args()
+
+    def spec(value: str) -> StrategySpec:
+        role = Role(value)
+        if args.time_limit is not None and role == Role.ALPHA_BETA:
+            return role, {"time_limit": args.time_limit}
+        return role
+
+    print(run_tournament(spec(args.player_a), spec(args.player_b), args.games, size=args.size,
+                         workers=args.workers, chunk_size=args.chunk_size, seed=args.seed).summary())
@@ -0,0 +1,185 @@
+'''
+Batching and coalescing for the news observable.
+
+NewsObservable.notify calls update() once per news item, so a burst of hundreds of items
+means hundreds of emails. BatchingNewsPublisher lets a subscriber pick a BatchPolicy; its
+news is buffered and handed over as one update_batch(events) call when
+
+window      -> `window` seconds have passed since the first buffered item
+max_batch   -> `max_batch` items are buffered
+flush()     -> always (e.g. at shutdown)
+
+latest_only=True keeps only the newest item per topic: older ones are coalesced (replaced)
+and never delivered. It decides what is kept, not when it is sent, so it needs a window
+or a max_batch as well. Subscribers without a policy still get update() right away.
+
+Deadlines are checked on every notify and by flush_due(), which a scheduler tick or event
+loop should call when no news arrives. stats[handle] counts per subscriber what was
+received, delivered (items in batches), how many batches, what was coalesced, and the
+items of batches whose update_batch() raised (failed). A subscriber's stats leave with it.
+'''
+import heapq
+import itertools
+import time
+
+from news_publisher import NewsObservable
+
+
+class BatchPolicy:
+    def __init__(self, window=None, max_batch=None, latest_only=False):
+        if window is None and max_batch is None:
+            # nothing would ever flush the batch except a manual flush()
+            raise ValueError("BatchPolicy needs a window or a max_batch")
+        if max_batch is not None and max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+        self.window = window
+        self.max_batch = max_batch
+        self.latest_only = latest_only
+
+
+class Batch:
+    """News buffered for one subscriber."""
+
+    __slots__ = ("policy", "events", "deadline")
+
+    def __init__(self, policy):
+        self.policy = policy
+        self.events = {} if policy.latest_only else []  # topic -> newest news, or every news
+        self.deadline = None  # set by the first buffered item when the policy has a window
+
+    def __len__(self):
+        return len(self.events)
+
+    def add(self, news, topic):
+        # returns how many buffered items this one replaced
+        if not self.policy.latest_only:
+            self.events.append(news)
+            return 0
+        coalesced = topic in self.events
+        self.events.pop(topic, None)  # the newest item goes last
+        self.events[topic] = news
+        return int(coalesced)
+
+    def take(self):
+        events = list(self.events.values()) if self.policy.latest_only else self.events
+        self.events = {} if self.policy.latest_only else []
+        self.deadline = None
+        return events
+
+
+class BatchingNewsPublisher(NewsObservable):
+    def __init__(self, clock=time.monotonic):
+        super().__init__()
+        self.clock = clock
+        self.batches = {}  # subscription handle -> Batch
+        self.stats = {}  # subscription handle -> counters of that subscriber
+        self._deadlines = []  # heap of (deadline, seq, handle); stale entries are skipped
+        self._seq = itertools.count()
+
+    def subscribe(self, observer, topics=None, weak=False, policy=None):
+        handle = super().subscribe(observer, topics, weak)
+        if policy is not None:
+            self.batches[handle] = Batch(policy)
+            self.stats[handle] = {"name": observer.name, "received": 0, "delivered": 0,
+                                  "batches": 0, "coalesced": 0, "failed": 0}
+        return handle
+
+    def _remove(self, handle):
+        # buffered news of a subscriber that leaves is discarded
+        observer = super()._remove(handle)
+        self.batches.pop(handle, None)
+        self.stats.pop(handle, None)
+        return observer
+
+    def notify(self, news=None, topic=None):
+        batches = self.batches
+        now = None
+        for handle, observer in self.recipients(topic):
+            batch = batches.get(handle)
+            if batch is None:
+                observer.update(news)
+                continue
+            stats = self.stats[handle]
+            stats["received"] += 1
+            stats["coalesced"] += batch.add(news, topic)
+            policy = batch.policy
+            if policy.max_batch is not None and len(batch) >= policy.max_batch:
+                self._deliver(handle, observer, batch)
+            elif batch.deadline is None and policy.window is not None:
+                if now is None:
+                    now = self.clock()
+                batch.deadline = now + policy.window
+                heapq.heappush(self._deadlines, (batch.deadline, next(self._seq), handle))
+        self.flush_due(now)
+
+    def flush_due(self, now=None):
+        """Deliver every batch whose window has passed; returns how many were delivered."""
+        deadlines = self._deadlines
+        if not deadlines:
+            return 0
+        if now is None:
+            now = self.clock()
+        flushed = 0
+        while deadlines and deadlines[0][0] <= now:
+            deadline, _, handle = heapq.heappop(deadlines)
+            batch = self.batches.get(handle)
+            if batch is None or batch.deadline != deadline:
+                continue  # flushed early (max_batch) or unsubscribed
+            observer = self.observer(handle)
+            if observer is not None:
+                self._deliver(handle, observer, batch)
+                flushed += 1
+        return flushed
+
+    def flush(self):
+        """Deliver everything that is buffered, whatever the policies say."""
+        for handle, batch in list(self.batches.items()):
+            observer = self.observer(handle)
+            if batch and observer is not None:
+                self._deliver(handle, observer, batch)
+        self._deadlines.clear()
+
+    def _deliver(self, handle, observer, batch):
+        events = batch.take()
+        try:
+            observer.update_batch(events)
+            failed = False
+        except Exception:
+            # like AsyncNewsPublisher: counted, and one subscriber cannot stop the others
+            failed = True
+        stats = self.stats.get(handle)
+        if stats is None:
+            return  # unsubscribed from inside update_batch()
+        if failed:
+            stats["failed"] += len(events)
+        else:
+            stats["delivered"] += len(events)
+            stats["batches"] += 1
+
+    def report(self):
+        """Per subscriber: name, received, delivered, batches, coalesced and failed counts."""
+        return [dict(stats, handle=handle) for handle, stats in self.stats.items()]
+
+
+if __name__ == "__main__":
+    from news_publisher import EmailSubscriber, SMSSubscriber
+
+    now = [0.0]
+    publisher = BatchingNewsPublisher(clock=lambda: now[0])  # simulated clock, one tick per second
+    publisher.subscribe(EmailSubscriber(), policy=BatchPolicy(window=60, max_batch=100))  # digest
+    publisher.subscribe(SMSSubscriber(), topics=["match-1", "match-2"],
+                        policy=BatchPolicy(window=10, latest_only=True))  # newest score per match
+    publisher.subscribe(SMSSubscriber(), topics=["breaking"])  # no policy: every item right away
+
+    for second in range(150):
+        now[0] = second
+        for match in ("match-1", "match-2"):
+            publisher.notify(f"{match} minute {second}", topic=match)
+        if second % 50 == 0:
+            publisher.notify(f"breaking news at {second}s", topic="breaking")
+        publisher.flush_due()
+    publisher.flush()
+
+    for row in publisher.report():
+        print(f"{row['name']:>5} #{row['handle']}: received {row['received']}, delivered {row['delivered']} "
+              f"in {row['batches']} calls, coalesced {row['coalesced']}, failed {row['failed']}")
@@ -0,0 +1,223 @@
+'''
+Asynchronous publish/subscribe pipeline for the news observable.
+
+NewsObservable.notify calls update() of every subscriber one after another on the
+publisher's thread, so one slow EmailSubscriber holds up every SMSSubscriber.
+AsyncNewsPublisher keeps the topic index (notify only touches the subscribers of the
+topic) but only enqueues into a bounded inbox per subscriber:
+
+notify        -> put news into the inboxes of the topic's subscribers; a subscriber with
+                 a newly non-empty inbox joins the ready queue (O(subscribers of topic))
+delivery loop -> one asyncio task drains the inboxes of ready subscribers
+slow path     -> if update() returns a coroutine, that subscriber continues on its own
+                 task until its inbox is empty, so it never holds up the others
+
+A full inbox drops its oldest item (counted in stats["dropped"]) instead of blocking
+the publisher.
+
+usage: await publisher.start(); publisher.notify(news, topic); await publisher.close()
+'''
+import asyncio
+import inspect
+from collections import deque
+
+from news_publisher import NewsObservable
+
+
+class Inbox:
+    """Bounded per-subscriber queue; put() never blocks, a full inbox drops its oldest item."""
+
+    __slots__ = ("items", "scheduled", "task")
+
+    def __init__(self, maxsize):
+        self.items = deque(maxlen=maxsize)
+        self.scheduled = False  # in the ready queue or being drained
+        self.task = None  # own delivery task while update() is a coroutine
+
+    def put(self, item):
+        dropped = len(self.items) == self.items.maxlen
+        self.items.append(item)
+        return dropped
+
+
+class AsyncNewsPublisher(NewsObservable):
+    def __init__(self, queue_size=64, yield_every=1000):
+        super().__init__()
+        self.queue_size = queue_size
+        # the delivery loop lets the publisher run after this many deliveries
+        self.yield_every = yield_every
+        self.inboxes = {}  # subscription handle -> Inbox
+        # (handle, inbox) with queued news; the handle, not the observer, so that queued
+        # news does not keep a weakly held subscriber alive
+        self._ready = deque()
+        self._wake = None
+        self._idle = None
+        self._loop_task = None
+        self._outstanding = 0  # items queued but not delivered yet
+        self.stats = {"published": 0, "enqueued": 0, "delivered": 0, "dropped": 0, "failed": 0}
+
+    async def start(self):
+        self._wake = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._loop_task = asyncio.create_task(self._run())
+
+    def subscribe(self, observer, topics=None, weak=False):
+        handle = super().subscribe(observer, topics, weak)
+        self.inboxes[handle] = Inbox(self.queue_size)
+        return handle
+
+    def _remove(self, handle):
+        # unsubscribe, or a weakly held subscriber died
+        observer = super()._remove(handle)
+        inbox = self.inboxes.pop(handle, None)
+        if inbox is None:
+            return observer
+        self._outstanding -= len(inbox.items)  # undelivered items are discarded
+        inbox.items.clear()
+        if inbox.task is not None:
+            inbox.task.cancel()
+            self._outstanding -= 1  # the item it was delivering
+        if self._idle is not None:
+            self._check_idle()
+        return observer
+
+    def notify(self, news=None, topic=None):
+        if self._loop_task is None:
+            raise RuntimeError("AsyncNewsPublisher is not started")
+        self.stats["published"] += 1
+        inboxes, ready = self.inboxes, self._ready
+        enqueued = dropped = 0
+        for handle, _ in self.recipients(topic):
+            inbox = inboxes[handle]
+            if inbox.put(news):
+                dropped += 1
+            else:
+                enqueued += 1
+            if not inbox.scheduled:
+                inbox.scheduled = True
+                ready.append((handle, inbox))
+        self.stats["enqueued"] += enqueued
+        self.stats["dropped"] += dropped
+        if enqueued:
+            self._outstanding += enqueued
+            self._idle.clear()
+            self._wake.set()
+
+    async def _run(self):
+        ready = self._ready
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            since_yield = 0
+            while ready:
+                since_yield += self._drain(*ready.popleft())
+                if since_yield >= self.yield_every:
+                    self._outstanding -= since_yield
+                    since_yield = 0
+                    await asyncio.sleep(0)
+            self._outstanding -= since_yield
+            self._check_idle()
+
+    def _drain(self, handle, inbox):
+        # delivers what is queued; returns how many items were finished
+        items = inbox.items
+        observer = self.observer(handle)
+        if observer is None:
+            # unsubscribed or died meanwhile: nothing left to deliver to
+            dropped = len(items)
+            items.clear()
+            inbox.scheduled = False
+            return dropped
+        delivered = failed = 0
+        while items:
+            try:
+                result = observer.update(items.popleft())
+            except Exception:
+                failed += 1
+                continue
+            if result is not None and inspect.isawaitable(result):
+                # slow path: this subscriber continues on its own task
+                inbox.task = asyncio.create_task(self._drain_async(handle, inbox, result))
+                break
+            delivered += 1
+        else:
+            inbox.scheduled = False
+        stats = self.stats
+        stats["delivered"] += delivered
+        if failed:
+            stats["failed"] += failed
+        return delivered + failed
+
+    async def _drain_async(self, handle, inbox, pending):
+        items = inbox.items
+        while True:
+            try:
+                await pending
+                self.stats["delivered"] += 1
+            except Exception:
+                self.stats["failed"] += 1
+            if self.inboxes.get(handle) is not inbox:
+                return  # removed while delivering; _remove already settled its count
+            self._outstanding -= 1
+            if not items:
+                break
+            # looked up per item: a weak subscriber may die between two deliveries
+            observer = self.observer(handle)
+            if observer is None:
+                self._outstanding -= len(items)
+                items.clear()
+                break
+            try:
+                pending = observer.update(items.popleft())
+                if not inspect.isawaitable(pending):
+                    pending = asyncio.sleep(0)  # plain update(): already delivered
+            except Exception as e:
+                pending = _raise(e)
+            observer = None
+        inbox.task = None
+        inbox.scheduled = False
+        self._check_idle()
+
+    def backlog(self):
+        """Notifications queued but not delivered yet."""
+        return self._outstanding
+
+    def _check_idle(self):
+        if self._outstanding <= 0:
+            self._idle.set()
+
+    async def drain(self):
+        """Wait until every queued notification has been delivered."""
+        await self._idle.wait()
+
+    async def close(self):
+        await self.drain()
+        self._loop_task.cancel()
+        await asyncio.gather(self._loop_task, return_exceptions=True)
+        self._loop_task = None
+
+
+async def _raise(error):
+    raise error
+
+
+if __name__ == "__main__":
+    from news_publisher import EmailSubscriber, SMSSubscriber
+
+    class SlowEmailSubscriber(EmailSubscriber):
+        async def update(self, news=None):
+            await asyncio.sleep(0.2)  # e.g. an SMTP round trip
+            super().update(news)
+
+    async def main():
+        publisher = AsyncNewsPublisher(queue_size=8)
+        publisher.subscribe(SlowEmailSubscriber())
+        publisher.subscribe(SMSSubscriber(), topics=["sports"])
+        await publisher.start()
+        publisher.notify("Final score 2-1", topic="sports")  # SMS is delivered right away
+        publisher.notify("Markets up", topic="business")  # only the email subscriber gets this
+        await publisher.close()
+        print(publisher.stats)
+
+    asyncio.run(main())
@@ -4,7 +4,18 @@ A NewsPublisher (subject) sends news updates.
 Multiple Subscribers (observers) receive notifications.
 
 Subscribers can subscribe/unsubscribe at runtime.
+
+Subscribers can pick topics: a topic -> subscribers index means notify(news, topic) only
+touches the subscribers of that topic (plus the ones that take every topic).
+
+Subscriptions live in ObserverRegistry objects (insertion-ordered dicts keyed by the handle
+subscribe() returns), so subscribe and unsubscribe are O(1) however many subscribers there
+are. subscribe(observer, weak=True) keeps only a weak reference: a subscriber nobody else
+holds on to is dropped automatically instead of leaking.
 '''
+import itertools
+import threading
+import weakref
 
 #interface - observable
 from abc import ABC,abstractmethod
@@ -22,38 +33,182 @@ class NewsObservableInterface(ABC):
 #observer interface
 class ObserverInterface(ABC):
     @abstractmethod
-    def update(self):
+    def update(self,news=None):
         pass
+    def update_batch(self,events):
+        # batched delivery (news_batching.py); one update() per event unless overridden
+        for news in events:
+            self.update(news)
+
+#handle -> observer (or weakref.ref to it), in subscription order
+class ObserverRegistry():
+    '''
+    items() walks a snapshot of the entries that is rebuilt only after a change, so observers
+    may subscribe or unsubscribe (from inside update() or from another thread) while a
+    notify is running: an entry removed meanwhile is skipped, one added meanwhile gets the
+    next notification.
+    '''
+    def __init__(self):
+        self._entries={}
+        self._snapshot=()  # None when stale
+        self._lock=threading.RLock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self,handle):
+        return handle in self._entries
+
+    def add(self,handle,entry):
+        with self._lock:
+            self._entries[handle]=entry
+            self._snapshot=None
+
+    def remove(self,handle):
+        with self._lock:
+            if self._entries.pop(handle,None) is not None:
+                self._snapshot=None
+
+    def snapshot(self):
+        # immutable (handle, entry) pairs; an entry may have been removed since
+        snapshot=self._snapshot
+        if snapshot is None:
+            with self._lock:
+                snapshot=self._snapshot=tuple(self._entries.items())
+        return snapshot
+
+    def items(self):
+        # (handle, observer) of the live entries
+        entries=self._entries
+        for handle,entry in self.snapshot():
+            if handle not in entries:
+                continue
+            if type(entry) is weakref.ref:
+                entry=entry()
+                if entry is None:
+                    continue
+            yield handle,entry
 
 #concreate observable
 class NewsObservable(NewsObservableInterface):
     def __init__(self):
-        self.observers=[]
+        self.observers=ObserverRegistry()  # subscribed to every topic
+        self.topics={}  # topic -> ObserverRegistry of that topic
+        self._subscriptions={}  # handle -> (id of observer, observer or weakref, topics)
+        self._handles={}  # id of observer -> its handles
+        self._next_handle=itertools.count(1)
+        self._lock=threading.RLock()
     
-    def subscribe(self,observer:ObserverInterface):
-        self.observers.append(observer)
+    def subscribe(self,observer:ObserverInterface,topics=None,weak=False):
+        # returns the handle of this subscription (for unsubscribe)
+        with self._lock:
+            handle=next(self._next_handle)
+            entry=weakref.ref(observer,lambda _,handle=handle:self._remove(handle)) if weak else observer
+            topics=None if topics is None else tuple(dict.fromkeys(topics))  # each topic once
+            self._subscriptions[handle]=(id(observer),entry,topics)
+            self._handles.setdefault(id(observer),set()).add(handle)
+            if topics is None:
+                self.observers.add(handle,entry)
+            else:
+                for topic in topics:
+                    registry=self.topics.get(topic)
+                    if registry is None:
+                        registry=self.topics[topic]=ObserverRegistry()
+                    registry.add(handle,entry)
         print(observer.name," user subscribed")
+        return handle
     
-    def unsubscribe(self,observer:ObserverInterface):
-        self.observers.remove(observer)
-        print(observer.name," user unsubscribed")
+    def unsubscribe(self,observer):
+        # observer: a handle (drops that subscription) or the observer (drops all of its subscriptions)
+        with self._lock:
+            if isinstance(observer,int):
+                handles=[observer] if observer in self._subscriptions else []
+            else:
+                handles=list(self._handles.get(id(observer),()))
+            if not handles:
+                raise ValueError("Not subscribed")
+            for handle in handles:
+                removed=self._remove(handle)
+        if removed is not None:
+            print(removed.name," user unsubscribed")
 
-    def notify(self):
-        for observer in self.observers:
-            observer.update()
+    def _remove(self,handle):
+        # also called when a weakly held observer dies; returns the observer if still alive
+        with self._lock:
+            subscription=self._subscriptions.pop(handle,None)
+            if subscription is None:
+                return None
+            key,entry,topics=subscription
+            handles=self._handles[key]
+            handles.discard(handle)
+            if not handles:
+                del self._handles[key]
+            if topics is None:
+                self.observers.remove(handle)
+            else:
+                for topic in topics:
+                    registry=self.topics.get(topic)
+                    if registry is None:
+                        continue
+                    registry.remove(handle)
+                    if not registry:
+                        del self.topics[topic]
+        return entry() if type(entry) is weakref.ref else entry
+
+    def __len__(self):
+        return len(self._subscriptions)
+
+    def observer(self,handle):
+        # the subscribed observer, None if the handle is gone or a weak observer died
+        subscription=self._subscriptions.get(handle)
+        if subscription is None:
+            return None
+        entry=subscription[1]
+        return entry() if type(entry) is weakref.ref else entry
+
+    def _registries(self,topic):
+        if topic is None:
+            return (self.observers,)
+        registry=self.topics.get(topic)
+        return (self.observers,) if registry is None else (self.observers,registry)
+
+    def recipients(self,topic=None):
+        # (handle, observer) of everyone who gets a notification for topic
+        for registry in self._registries(topic):
+            yield from registry.items()
+
+    def subscribers(self,topic=None):
+        return [observer for _,observer in self.recipients(topic)]
+
+    def notify(self,news=None,topic=None):
+        # same walk as ObserverRegistry.items(), inlined: this is the hot loop
+        for registry in self._registries(topic):
+            entries=registry._entries
+            for handle,observer in registry.snapshot():
+                if handle not in entries:
+                    continue
+                if type(observer) is weakref.ref:
+                    observer=observer()
+                    if observer is None:
+                        continue
+                observer.update(news)
         
 #concrete observers
 class EmailSubscriber(ObserverInterface):
     def __init__(self):
         self.name="email"
-    def update(self):
-        print("Received notification through email")
+    def update(self,news=None):
+        print("Received notification through email"+(f": {news}" if news else ""))
+    def update_batch(self,events):
+        print(f"Received {len(events)} notifications in one email"+(f", latest: {events[-1]}" if events else ""))
 
 class SMSSubscriber(ObserverInterface):
     def __init__(self):
         self.name="SMS"
-    def update(self):
-        print("Received notification through SMS")
+    def update(self,news=None):
+        print("Received notification through SMS"+(f": {news}" if news else ""))
+    def update_batch(self,events):
+        print(f"Received {len(events)} notifications in one SMS"+(f", latest: {events[-1]}" if events else ""))
 
 #client code 
 
@@ -68,4 +223,25 @@ if __name__=='__main__':
     news_observable.unsubscribe(email_subscriber)
     news_observable.notify()
 
+    # topics: only the subscribers of "sports" are touched
+    sports_sms = SMSSubscriber()
+    news_observable.subscribe(sports_sms,topics=["sports"])
+    news_observable.notify("Final score 2-1",topic="sports")
+    news_observable.notify("Markets up",topic="business")
+
+    # weak subscription: dropped as soon as nothing else holds the subscriber
+    sports_email=EmailSubscriber()
+    news_observable.subscribe(sports_email,topics=["sports"],weak=True)
+    news_observable.notify("Extra time",topic="sports")
+    del sports_email
+    news_observable.notify("Penalties",topic="sports")  # SMS only
+    handle=news_observable.subscribe(EmailSubscriber(),topics=["business"])
+    news_observable.unsubscribe(handle)
+
+    # a topic listed twice is one subscription to it: one update, and unsubscribe cleans up
+    handle=news_observable.subscribe(EmailSubscriber(),topics=["weather","weather"])
+    assert len(news_observable.topics["weather"])==1
+    news_observable.unsubscribe(handle)
+    assert "weather" not in news_observable.topics
+
 
@@ -0,0 +1,163 @@
+"""Benchmark: publishing news to 100k subscribers.
+
+100k subscribers spread over 1000 topics (100 each) plus 100 that take every topic,
+optionally a few slow ones on every topic (an awaited 50ms "email" per delivery). Compares
+  - fan-out to everyone (the original notify without topics), synchronous
+  - NewsObservable with the topic index, synchronous
+  - AsyncNewsPublisher: topic index + per-subscriber inboxes on asyncio
+plus subscriber churn (unsubscribe + subscribe) against the full registry. To show that
+slow subscribers do not hold up the fast ones, the async publisher also runs at a fixed
+publish rate with and without slow subscribers and reports the fast subscribers' latency
+(news is the publish time) and when the slow ones finished.
+
+usage: python publish_benchmark.py [subscribers] [publishes]
+"""
+import asyncio
+import contextlib
+import io
+import random
+import sys
+import time
+
+from news_pipeline import AsyncNewsPublisher
+from news_publisher import NewsObservable, ObserverInterface
+
+
+class CountingSubscriber(ObserverInterface):
+    def __init__(self, name="counter"):
+        self.name = name
+        self.received = 0
+        self.last_delivery = 0.0
+
+    def update(self, news=None):
+        self.received += 1
+        self.last_delivery = time.perf_counter()
+
+
+class LatencySubscriber(CountingSubscriber):
+    """News is its publish time; keeps the total and worst delivery latency."""
+
+    def __init__(self, name="counter"):
+        super().__init__(name)
+        self.total_latency = 0.0
+        self.worst_latency = 0.0
+
+    def update(self, news=None):
+        super().update(news)
+        latency = self.last_delivery - news
+        self.total_latency += latency
+        self.worst_latency = max(self.worst_latency, latency)
+
+
+class SlowSubscriber(LatencySubscriber):
+    async def update(self, news=None):
+        await asyncio.sleep(0.05)
+        super().update(news)
+
+
+def build(publisher, subscribers, topics, slow=0, kind=CountingSubscriber):
+    everyone = 100
+    people = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(subscribers - everyone - slow):
+            subscriber = kind()
+            publisher.subscribe(subscriber, topics=[i % topics])
+            people.append(subscriber)
+        for i in range(everyone + slow):
+            subscriber = SlowSubscriber() if i < slow else kind()
+            publisher.subscribe(subscriber)
+            people.append(subscriber)
+    return people
+
+
+def bench_sync(subscribers, topics, publishes):
+    publisher = NewsObservable()
+    people = build(publisher, subscribers, topics)
+    rng = random.Random(5)
+    started = time.perf_counter()
+    for i in range(publishes):
+        publisher.notify(i, topic=rng.randrange(topics))
+    seconds = time.perf_counter() - started
+    return publishes / seconds, sum(p.received for p in people) / seconds
+
+
+def bench_sync_everyone(subscribers, publishes):
+    publisher = NewsObservable()
+    with contextlib.redirect_stdout(io.StringIO()):
+        people = [CountingSubscriber() for _ in range(subscribers)]
+        for subscriber in people:
+            publisher.subscribe(subscriber)
+    started = time.perf_counter()
+    for i in range(publishes):
+        publisher.notify(i)
+    seconds = time.perf_counter() - started
+    return publishes / seconds, sum(p.received for p in people) / seconds
+
+
+def bench_churn(subscribers, topics, rounds=20_000):
+    publisher = NewsObservable()
+    rng = random.Random(9)
+    with contextlib.redirect_stdout(io.StringIO()):
+        handles = [publisher.subscribe(CountingSubscriber(), topics=[i % topics]) for i in range(subscribers)]
+        started = time.perf_counter()
+        for _ in range(rounds):
+            i = rng.randrange(subscribers)
+            publisher.unsubscribe(handles[i])
+            handles[i] = publisher.subscribe(CountingSubscriber(), topics=[i % topics])
+    return rounds / (time.perf_counter() - started)
+
+
+async def bench_async(subscribers, topics, publishes, slow=0, rate=None):
+    """rate=None publishes as fast as delivery keeps up, otherwise `rate` publishes per second."""
+    publisher = AsyncNewsPublisher(queue_size=64)
+    people = build(publisher, subscribers, topics, slow, kind=LatencySubscriber)
+    await publisher.start()
+    rng = random.Random(5)
+    started = time.perf_counter()
+    for i in range(publishes):
+        publisher.notify(time.perf_counter(), topic=rng.randrange(topics))
+        if rate is not None:
+            await asyncio.sleep(max(0.0, started + (i + 1) / rate - time.perf_counter()))
+        while publisher.backlog() > 2_000:
+            await asyncio.sleep(0)
+    publish_seconds = time.perf_counter() - started
+    await publisher.close()
+    fast = [p for p in people if not isinstance(p, SlowSubscriber) and p.received]
+    slow_ones = [p for p in people if isinstance(p, SlowSubscriber)]
+    return {
+        "publishes/s": publishes / publish_seconds,
+        "deliveries/s": publisher.stats["delivered"] / (time.perf_counter() - started),
+        "fast_done": max(p.last_delivery for p in fast) - started,
+        "fast_mean": sum(p.total_latency for p in fast) / sum(p.received for p in fast),
+        "fast_worst": max(p.worst_latency for p in fast),
+        "slow_done": max(p.last_delivery for p in slow_ones) - started if slow_ones else None,
+        "dropped": publisher.stats["dropped"],
+    }
+
+
+if __name__ == "__main__":
+    subscribers = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    publishes = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    topics = 1000
+
+    rate, deliveries = bench_sync_everyone(subscribers, 20)
+    print(f"{subscribers:,} subscribers, {topics} topics")
+    print(f"  notify everyone (sync)   : {rate:>10,.1f} publishes/s  {deliveries:>12,.0f} deliveries/s")
+    rate, deliveries = bench_sync(subscribers, topics, publishes)
+    print(f"  topic index (sync)       : {rate:>10,.0f} publishes/s  {deliveries:>12,.0f} deliveries/s")
+    rate = bench_churn(subscribers, topics)
+    print(f"  churn (unsub + sub)      : {rate:>10,.0f} rounds/s")
+    result = asyncio.run(bench_async(subscribers, topics, publishes))
+    print(f"  AsyncNewsPublisher       : {result['publishes/s']:>10,.0f} publishes/s  "
+          f"{result['deliveries/s']:>12,.0f} deliveries/s")
+
+    # fixed load, well below the throughput above, so latency is not just queueing
+    rate = 500
+    print(f"  AsyncNewsPublisher at {rate} publishes/s for {publishes // 10:,} publishes:")
+    for slow in (0, 10):
+        result = asyncio.run(bench_async(subscribers, topics, publishes // 10, slow=slow, rate=rate))
+        line = (f"    {slow:>2} slow subscribers   : fast latency mean {result['fast_mean'] * 1e3:6.2f}ms "
+                f"worst {result['fast_worst'] * 1e3:6.2f}ms, fast done after {result['fast_done']:.2f}s")
+        if result["slow_done"] is not None:
+            line += f", slow done after {result['slow_done']:.2f}s (dropped {result['dropped']:,})"
+        print(line)
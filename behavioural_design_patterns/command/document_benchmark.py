@@ -0,0 +1,59 @@
+'''
+Benchmark: Document storage backends under random edits.
+
+Applies the same sequence of random inserts/deletes to a Document backed by
+StringStorage and one backed by PieceTableStorage, checks both end with the same
+text and prints the time each backend took.
+
+usage: python document_benchmark.py [edits] [initial_size]
+'''
+import random
+import sys
+import time
+
+from text_editor import Document, StringStorage, PieceTableStorage
+
+
+def make_edits(count, initial_size, seed=42):
+    rng = random.Random(seed)
+    edits = []
+    length = initial_size
+    for _ in range(count):
+        if length == 0 or rng.random() < 0.5:
+            text = "".join(rng.choice("abcdefgh ") for _ in range(rng.randint(1, 8)))
+            edits.append(("insert", rng.randint(0, length), text))
+            length += len(text)
+        else:
+            start = rng.randint(0, length - 1)
+            end = min(length, start + rng.randint(1, 8))
+            edits.append(("delete", start, end))
+            length -= end - start
+    return edits
+
+
+def run(storage, edits):
+    doc = Document(storage)
+    started = time.perf_counter()
+    for op, a, b in edits:
+        if op == "insert":
+            doc.insert(b, a)
+        else:
+            doc.delete(a, b)
+    text = str(doc)  # includes the lazy materialization cost
+    return time.perf_counter() - started, text
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    initial_size = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+    initial = ("lorem ipsum dolor sit amet " * (initial_size // 27 + 1))[:initial_size]
+    edits = make_edits(count, initial_size)
+
+    string_time, string_text = run(StringStorage(initial), edits)
+    piece_time, piece_text = run(PieceTableStorage(initial), edits)
+    assert string_text == piece_text, "backends disagree"
+
+    print(f"{count} random edits on a {initial_size} char document")
+    print(f"StringStorage     : {string_time:.3f}s")
+    print(f"PieceTableStorage : {piece_time:.3f}s")
+    print(f"speedup           : {string_time / piece_time:.1f}x")
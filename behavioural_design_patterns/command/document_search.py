@@ -0,0 +1,176 @@
+'''
+Search for the command pattern text editor.
+
+LineIndex listens to a Document and keeps the offsets of all newlines up to date on every
+insert/delete, so offset <-> (line, column) lookups are a binary search instead of a rescan.
+Offsets are kept in blocks relative to a per-block start, so an edit costs
+O(block + number of blocks), not O(lines after the cursor).
+
+DocumentSearch puts the index and the Document find methods together, and replaces all
+matches through one ReplaceAllCommand (one rebuild, one undo entry) instead of a
+DeleteCommand + InsertCommand per match.
+'''
+from bisect import bisect_left, bisect_right
+
+from text_editor import ReplaceAllCommand
+
+
+def _newline_offsets(text, base=0):
+    offsets = []
+    pos = text.find("\n")
+    while pos != -1:
+        offsets.append(base + pos)
+        pos = text.find("\n", pos + 1)
+    return offsets
+
+
+#==================line index (Document listener)==================
+class LineIndex:
+    """Newline offsets in blocks of ~BLOCK entries, each stored relative to its block's start.
+
+    An edit rewrites the offsets of one block (O(BLOCK)) and then only moves the start offset
+    and line count of the blocks behind it (O(lines / BLOCK)), instead of shifting every
+    offset after the cursor. Lookups are a binary search over blocks, then within one.
+    """
+    BLOCK = 256
+
+    def __init__(self):
+        self.on_reset("")
+
+    def on_reset(self, text):
+        newlines = _newline_offsets(text)
+        size = self.BLOCK
+        self._bounds = [0]  # start offset of each block's range of the text
+        self._blocks = [[]]  # newline offsets relative to the block's bound
+        self._lines = [0]  # newlines before each block
+        for i in range(0, len(newlines), size):
+            chunk = newlines[i:i + size]
+            if i:
+                self._bounds.append(chunk[0])
+                self._blocks.append([])
+                self._lines.append(i)
+            bound = self._bounds[-1]
+            self._blocks[-1] = [off - bound for off in chunk]
+
+    def _block_of(self, offset):
+        return bisect_right(self._bounds, offset) - 1
+
+    def _shift_after(self, b, delta, lines):
+        bounds, counts = self._bounds, self._lines
+        for k in range(b + 1, len(bounds)):
+            bounds[k] += delta
+            counts[k] += lines
+
+    def _split(self, b):
+        block, size = self._blocks[b], self.BLOCK
+        while len(block) > 2 * size:
+            head, tail = block[:size], block[size:]
+            base = tail[0]
+            self._blocks[b] = head
+            self._blocks.insert(b + 1, [off - base for off in tail])
+            self._bounds.insert(b + 1, self._bounds[b] + base)
+            self._lines.insert(b + 1, self._lines[b] + size)
+            b += 1
+            block = self._blocks[b]
+
+    def on_insert(self, pos, text):
+        b = self._block_of(pos)
+        block = self._blocks[b]
+        rel = pos - self._bounds[b]
+        i = bisect_left(block, rel)
+        added = _newline_offsets(text, rel)
+        shift = len(text)
+        block[i:] = added + [off + shift for off in block[i:]]
+        self._shift_after(b, shift, len(added))
+        self._split(b)
+
+    def on_delete(self, start, length):
+        if not length:
+            return
+        end = start + length
+        b1, b2 = self._block_of(start), self._block_of(end)
+        base = self._bounds[b1]
+        # merge the blocks the deleted range touches into b1
+        merged = list(self._blocks[b1])
+        for b in range(b1 + 1, b2 + 1):
+            shift = self._bounds[b] - base
+            merged.extend(off + shift for off in self._blocks[b])
+        i = bisect_left(merged, start - base)
+        j = bisect_left(merged, end - base)
+        removed = j - i
+        merged[i:] = [off - length for off in merged[j:]]
+        del self._blocks[b1 + 1:b2 + 1], self._bounds[b1 + 1:b2 + 1], self._lines[b1 + 1:b2 + 1]
+        self._shift_after(b1, -length, -removed)
+        if not merged and b1:
+            # an empty block's range simply joins the previous block
+            del self._blocks[b1], self._bounds[b1], self._lines[b1]
+        else:
+            self._blocks[b1] = merged
+            self._split(b1)
+
+    def _newline(self, k):
+        # absolute offset of the k-th newline
+        b = bisect_right(self._lines, k) - 1
+        return self._bounds[b] + self._blocks[b][k - self._lines[b]]
+
+    def line_count(self):
+        return self._lines[-1] + len(self._blocks[-1]) + 1
+
+    def line_start(self, line):
+        if not 0 <= line < self.line_count():
+            raise IndexError(f"line {line} out of range")
+        return 0 if line == 0 else self._newline(line - 1) + 1
+
+    def line_end(self, line):
+        # offset of the line's "\n" (or None for the last line)
+        self.line_start(line)
+        return self._newline(line) if line < self.line_count() - 1 else None
+
+    def line_col(self, offset):
+        b = self._block_of(offset)
+        line = self._lines[b] + bisect_left(self._blocks[b], offset - self._bounds[b])
+        return line, offset - self.line_start(line)
+
+
+#==================search facade==================
+class DocumentSearch:
+    def __init__(self, document):
+        self.document = document
+        self.lines = LineIndex()
+        document.add_listener(self.lines)
+
+    def find(self, pattern, start=0):
+        return self.document.find(pattern, start)
+
+    def find_all(self, pattern):
+        """(offset, line, column) of every non-overlapping match."""
+        return [(pos, *self.lines.line_col(pos)) for pos in self.document.find_all(pattern)]
+
+    def line_text(self, line):
+        end = self.lines.line_end(line)
+        return self.document.storage.slice(self.lines.line_start(line),
+                                           len(self.document) if end is None else end)
+
+    def replace_all(self, editor, pattern, replacement):
+        command = ReplaceAllCommand(self.document, pattern, replacement)
+        editor.execute_command(command)
+        return len(command.edits)
+
+
+# ======== Client Code ========
+if __name__ == "__main__":
+    from text_editor import Document, Editor, InsertCommand, PieceTableStorage
+
+    doc = Document(PieceTableStorage("def foo():\n    return foo_bar()\n\nfoo()\n"))
+    editor = Editor()
+    search = DocumentSearch(doc)
+
+    print("Matches:", search.find_all("foo"))
+    editor.execute_command(InsertCommand(doc, "# header\n", 0))
+    print("After inserting a line:", search.find_all("foo"))
+    print("Line 2:", repr(search.line_text(2)))
+
+    print("Replaced:", search.replace_all(editor, "foo", "baz"))
+    print(doc)
+    editor.undo()
+    print("After undo:", search.find_all("foo"))
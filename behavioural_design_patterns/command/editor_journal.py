@@ -0,0 +1,239 @@
+'''
+Append-only journal for the command pattern text editor.
+
+Every command the Editor executes, undoes or redoes is written to a binary log file.
+Every `snapshot_every` records the whole Document (text + clipboard) is written to a
+snapshot file together with the log offset it belongs to.
+
+After a crash/restart: load the latest snapshot, memory-map the log and replay only the
+records written after that snapshot -> recovery time is bounded by snapshot_every, and the
+full history lives on disk instead of in the undo stack.
+
+log record  = header (op, command kind, payload length, crc32 of payload) + payload
+snapshot    = log offset + document text + clipboard
+'''
+import mmap
+import os
+import struct
+import zlib
+
+from text_editor import (InsertCommand, DeleteCommand, CutCommand, PasteCommand,
+                         CopyCommand, MacroCommand, ReplaceAllCommand, OP_UNDO)
+
+_HEADER = struct.Struct("<BBII")
+_INT = struct.Struct("<i")
+_OFFSET = struct.Struct("<Q")
+
+
+#==================encoding helpers==================
+def _pack_str(text):
+    data = text.encode("utf-8")
+    return _INT.pack(len(data)) + data
+
+
+class _Reader:
+    def __init__(self, data):
+        self.data = data
+        self.pos = 0
+
+    def int(self):
+        value = _INT.unpack_from(self.data, self.pos)[0]
+        self.pos += _INT.size
+        return value
+
+    def str(self):
+        length = self.int()
+        text = bytes(self.data[self.pos:self.pos + length]).decode("utf-8")
+        self.pos += length
+        return text
+
+    def edits(self):
+        return [(self.int(), self.int(), self.str()) for _ in range(self.int())]
+
+
+def _pack_edits(edits):
+    parts = [_INT.pack(len(edits))]
+    for start, end, text in edits:
+        parts.append(_INT.pack(start) + _INT.pack(end) + _pack_str(text))
+    return b"".join(parts)
+
+
+#==================command codecs==================
+# each command stores what it needs to be executed *and* undone on replay
+def _encode_insert(c):
+    return _INT.pack(c.pos) + _pack_str(c.text)
+
+def _decode_insert(r, doc):
+    pos = r.int()
+    return InsertCommand(doc, r.str(), pos)
+
+def _encode_delete(c):
+    return _INT.pack(c.start) + _INT.pack(c.end) + _pack_str(c.deleted)
+
+def _decode_delete(r, doc):
+    command = DeleteCommand(doc, r.int(), r.int())
+    command.deleted = r.str()
+    return command
+
+def _encode_cut(c):
+    return _INT.pack(c.start) + _INT.pack(c.end) + _pack_str(c.cut_text)
+
+def _decode_cut(r, doc):
+    command = CutCommand(doc, r.int(), r.int())
+    command.cut_text = r.str()
+    return command
+
+def _encode_paste(c):
+    return _INT.pack(c.pos) + _pack_str(c.pasted_text)
+
+def _decode_paste(r, doc):
+    command = PasteCommand(doc, r.int())
+    command.pasted_text = r.str()
+    return command
+
+def _encode_copy(c):
+    return _INT.pack(c.start) + _INT.pack(c.end)
+
+def _decode_copy(r, doc):
+    return CopyCommand(doc, r.int(), r.int())
+
+def _encode_macro(c):
+    return _pack_edits(c.edits) + _pack_edits(c.inverse)
+
+def _decode_macro(r, doc):
+    command = MacroCommand(doc, r.edits())
+    command.inverse = r.edits()
+    return command
+
+
+# command class -> (kind id, encoder); kind id -> decoder
+COMMAND_CODECS = {
+    InsertCommand: (1, _encode_insert),
+    DeleteCommand: (2, _encode_delete),
+    CutCommand: (3, _encode_cut),
+    PasteCommand: (4, _encode_paste),
+    CopyCommand: (5, _encode_copy),
+    MacroCommand: (6, _encode_macro),
+    ReplaceAllCommand: (6, _encode_macro),  # replayed as the plain macro it expanded to
+}
+COMMAND_DECODERS = {1: _decode_insert, 2: _decode_delete, 3: _decode_cut,
+                    4: _decode_paste, 5: _decode_copy, 6: _decode_macro}
+
+
+#==================journal==================
+class EditorJournal:
+    def __init__(self, path, snapshot_every=1000, sync=False):
+        self.path = path
+        self.snapshot_path = path + ".snap"
+        self.snapshot_every = snapshot_every
+        self.sync = sync  # fsync every record (survives power loss, not only process crash)
+        self._file = open(path, "ab")
+        self._since_snapshot = 0
+        self._has_snapshot = os.path.exists(self.snapshot_path)
+
+    def record(self, op, command):
+        codec = COMMAND_CODECS.get(type(command))
+        if codec is None:
+            raise ValueError(f"{type(command).__name__} cannot be journaled")
+        kind, encode = codec
+        payload = encode(command)
+        self._file.write(_HEADER.pack(op, kind, len(payload), zlib.crc32(payload)) + payload)
+        self._file.flush()
+        if self.sync:
+            os.fsync(self._file.fileno())
+        self._since_snapshot += 1
+        # the command is already applied, so a snapshot belongs to the offset after its record;
+        # the first one gives the log a base state, so a replay never depends on what was in memory
+        if not self._has_snapshot or self._since_snapshot >= self.snapshot_every:
+            self.snapshot(command.receiver)
+
+    def snapshot(self, document):
+        self._file.flush()
+        offset = self._file.tell()
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_OFFSET.pack(offset) + _pack_str(str(document)) + _pack_str(document.clipboard))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)  # atomic: old snapshot stays valid until here
+        self._has_snapshot = True
+        self._since_snapshot = 0
+
+    def recover(self, document):
+        """Rebuild document from the latest snapshot plus the log tail. Returns records replayed."""
+        if not self._has_snapshot:
+            return 0
+        with open(self.snapshot_path, "rb") as f:
+            data = f.read()
+        offset = _OFFSET.unpack_from(data)[0]
+        reader = _Reader(memoryview(data)[_OFFSET.size:])
+        document.reset(reader.str())
+        document.clipboard = reader.str()
+
+        replayed = 0
+        pos = offset
+        size = os.path.getsize(self.path)
+        if size > offset:
+            with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                while pos + _HEADER.size <= size:
+                    op, kind, length, crc = _HEADER.unpack_from(mm, pos)
+                    body = pos + _HEADER.size
+                    if body + length > size or zlib.crc32(mm[body:body + length]) != crc:
+                        break  # torn write from a crash
+                    command = COMMAND_DECODERS[kind](_Reader(mm[body:body + length]), document)
+                    if op == OP_UNDO:
+                        command.undo()
+                    else:
+                        command.execute()
+                    pos = body + length
+                    replayed += 1
+        if pos < size:
+            self._file.flush()
+            os.truncate(self.path, pos)  # drop the broken tail so new records stay readable
+        self._since_snapshot = replayed
+        return replayed
+
+    def close(self):
+        self._file.close()
+
+
+# ======== Client Code ========
+if __name__ == "__main__":
+    import tempfile
+    from text_editor import Document, Editor, HistoryPolicy
+
+    path = os.path.join(tempfile.mkdtemp(), "session.journal")
+
+    # session 1: small in-memory history, full history in the journal
+    doc = Document()
+    editor = Editor(HistoryPolicy(max_commands=2), journal=EditorJournal(path, snapshot_every=4))
+    editor.execute_command(InsertCommand(doc, "Hello World", 0))
+    editor.execute_command(CutCommand(doc, 0, 6))
+    editor.execute_command(PasteCommand(doc, len(doc)))
+    editor.execute_command(InsertCommand(doc, "!!!", len(doc)))
+    editor.undo()
+    editor.execute_command(DeleteCommand(doc, 0, 1))
+    print("Before crash:", doc)
+    editor.journal.close()
+
+    # session 2: restart and recover
+    recovered = Document()
+    journal = EditorJournal(path, snapshot_every=4)
+    print("Replayed records:", journal.recover(recovered))
+    print("After recovery:", recovered, "| clipboard:", repr(recovered.clipboard))
+    assert str(recovered) == str(doc) and recovered.clipboard == doc.clipboard
+    journal.close()
+
+    # a session shorter than snapshot_every recovers the same text
+    path = os.path.join(tempfile.mkdtemp(), "short.journal")
+    doc = Document()
+    editor = Editor(journal=EditorJournal(path, snapshot_every=1000))
+    editor.execute_command(InsertCommand(doc, "Hello", 0))
+    editor.execute_command(InsertCommand(doc, " World", 5))
+    editor.journal.close()
+    recovered = Document()
+    journal = EditorJournal(path, snapshot_every=1000)
+    journal.recover(recovered)
+    assert str(recovered) == str(doc) == "Hello World", str(recovered)
+    print("Short session recovered:", recovered)
+    journal.close()
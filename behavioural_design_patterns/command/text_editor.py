@@ -23,34 +23,283 @@ Receiver: Document
 '''
 
 from abc import ABC,abstractmethod
+from collections import deque
+
+#=====================Storage backends====================
+'''
+Document delegates raw text storage to a backend so that the editing cost can be chosen
+without changing the Document API.
+StringStorage  -> one python str, every edit rebuilds it (O(document length))
+PieceTableStorage -> list of pieces pointing into immutable buffers, edits only touch pieces
+'''
+class TextStorage(ABC):
+    @abstractmethod
+    def insert(self, pos, text):
+        pass
+
+    @abstractmethod
+    def delete(self, start, end):
+        """Remove text[start:end] and return the removed text."""
+        pass
+
+    @abstractmethod
+    def slice(self, start, end):
+        pass
+
+    @abstractmethod
+    def __len__(self):
+        pass
+
+    @abstractmethod
+    def __str__(self):
+        pass
+
+    def replace_many(self, edits):
+        """Apply sorted, non-overlapping (start, end, text) edits; return the replaced texts."""
+        # right to left, so earlier positions are not shifted by later edits
+        removed = []
+        for start, end, text in reversed(edits):
+            removed.append(self.delete(start, end))
+            self.insert(start, text)
+        removed.reverse()
+        return removed
+
+
+class StringStorage(TextStorage):
+    def __init__(self, text=""):
+        self.content = text
+
+    def insert(self, pos, text):
+        self.content = self.content[:pos] + text + self.content[pos:]
+
+    def delete(self, start, end):
+        deleted = self.content[start:end]
+        self.content = self.content[:start] + self.content[end:]
+        return deleted
+
+    def slice(self, start, end):
+        return self.content[start:end]
+
+    def replace_many(self, edits):
+        # single pass: the new string is built once instead of once per edit
+        parts = []
+        removed = []
+        prev = 0
+        for start, end, text in edits:
+            parts.append(self.content[prev:start])
+            parts.append(text)
+            removed.append(self.content[start:end])
+            prev = end
+        parts.append(self.content[prev:])
+        self.content = "".join(parts)
+        return removed
+
+    def __len__(self):
+        return len(self.content)
+
+    def __str__(self):
+        return self.content
+
+
+class PieceTableStorage(TextStorage):
+    # pieces are (buffer, start, length) tuples; buffers are never modified, an insert only
+    # adds a new piece. Pieces are grouped in blocks so locating a position skips whole blocks.
+    BLOCK_SIZE = 256
+
+    def __init__(self, text=""):
+        self._blocks = [[(text, 0, len(text))] if text else []]
+        self._block_lens = [len(text)]
+        self._length = len(text)
+        self._cache = text  # materialized text, None when stale
+
+    def _locate(self, pos, inclusive):
+        # returns (block index, offset inside block) for pos
+        for bi, blen in enumerate(self._block_lens):
+            if pos < blen or (inclusive and pos == blen):
+                return bi, pos
+            pos -= blen
+        last = len(self._blocks) - 1
+        return last, self._block_lens[last]
+
+    def _split_block(self, bi):
+        block = self._blocks[bi]
+        half = len(block) // 2
+        left, right = block[:half], block[half:]
+        left_len = sum(piece[2] for piece in left)
+        self._blocks[bi:bi + 1] = [left, right]
+        self._block_lens[bi:bi + 1] = [left_len, self._block_lens[bi] - left_len]
+
+    def insert(self, pos, text):
+        pos = slice(pos, pos).indices(self._length)[0]
+        if not text:
+            return
+        bi, off = self._locate(pos, inclusive=True)
+        block = self._blocks[bi]
+        new_piece = (text, 0, len(text))
+        idx = 0
+        while idx < len(block) and off > block[idx][2]:
+            off -= block[idx][2]
+            idx += 1
+        if idx == len(block) or off == 0:
+            block.insert(idx, new_piece)
+        elif off == block[idx][2]:
+            block.insert(idx + 1, new_piece)
+        else:
+            buf, s, l = block[idx]
+            block[idx:idx + 1] = [(buf, s, off), new_piece, (buf, s + off, l - off)]
+        self._block_lens[bi] += len(text)
+        self._length += len(text)
+        self._cache = None
+        if len(block) > self.BLOCK_SIZE:
+            self._split_block(bi)
+
+    def delete(self, start, end):
+        start, end, _ = slice(start, end).indices(self._length)
+        if start >= end:
+            return ""
+        bi, off = self._locate(start, inclusive=False)
+        remaining = end - start
+        parts = []
+        while remaining > 0:
+            kept = []
+            removed_here = 0
+            for piece in self._blocks[bi]:
+                buf, s, l = piece
+                if remaining == 0 or off >= l:
+                    if remaining:
+                        off -= l
+                    kept.append(piece)
+                    continue
+                cut_end = min(l, off + remaining)
+                parts.append(buf[s + off:s + cut_end])
+                if off > 0:
+                    kept.append((buf, s, off))
+                if cut_end < l:
+                    kept.append((buf, s + cut_end, l - cut_end))
+                remaining -= cut_end - off
+                removed_here += cut_end - off
+                off = 0
+            self._block_lens[bi] -= removed_here
+            if not kept and len(self._blocks) > 1:
+                del self._blocks[bi]
+                del self._block_lens[bi]
+            else:
+                self._blocks[bi] = kept
+                bi += 1
+        self._length -= end - start
+        self._cache = None
+        return "".join(parts)
+
+    def slice(self, start, end):
+        if self._cache is not None:
+            return self._cache[start:end]
+        start, end, _ = slice(start, end).indices(self._length)
+        if start >= end:
+            return ""
+        bi, off = self._locate(start, inclusive=False)
+        remaining = end - start
+        parts = []
+        while remaining > 0:
+            for buf, s, l in self._blocks[bi]:
+                if off >= l:
+                    off -= l
+                    continue
+                take = min(l - off, remaining)
+                parts.append(buf[s + off:s + off + take])
+                remaining -= take
+                off = 0
+                if remaining == 0:
+                    break
+            bi += 1
+        return "".join(parts)
+
+    def __len__(self):
+        return self._length
+
+    def __str__(self):
+        # text is only joined when somebody actually reads it
+        if self._cache is None:
+            self._cache = "".join(buf[s:s + l] for block in self._blocks for buf, s, l in block)
+        return self._cache
+
 
 #=====================Receiver====================
 class Document:
-    def __init__(self):
-        self.content = ""
+    def __init__(self, storage=None):
+        self.storage = storage if storage is not None else StringStorage()
         self.clipboard=""
+        self.listeners = []  # indexes that follow every edit, e.g. LineIndex (document_search.py)
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+        listener.on_reset(str(self))
+
+    @property
+    def content(self):
+        return str(self.storage)
 
     def insert(self,text,pos):
-        self.content=self.content[:pos]+text+self.content[pos:]
+        if self.listeners:
+            pos = slice(pos, pos).indices(len(self.storage))[0]
+        self.storage.insert(pos,text)
+        for listener in self.listeners:
+            listener.on_insert(pos, text)
     
     def delete(self,start,end):
-        deleted=self.content[start:end]
-        self.content = self.content[:start]+self.content[end:]
+        if self.listeners:
+            start = slice(start, end).indices(len(self.storage))[0]
+        deleted = self.storage.delete(start,end)
+        for listener in self.listeners:
+            listener.on_delete(start, len(deleted))
         return deleted
     
     def cut(self,start,end):
-        self.clipboard=self.content[start:end]
-        return self.delete(start,end)
+        self.clipboard=self.delete(start,end)
+        return self.clipboard
 
     def copy(self,start,end):
-        self.clipboard=self.content[start:end]
+        self.clipboard=self.storage.slice(start,end)
     
     def paste(self,start):
         if self.clipboard:
             self.insert(self.clipboard,start)
+
+    def replace_many(self, edits):
+        removed = self.storage.replace_many(edits)
+        self._notify_reset()  # one rebuild of the indexes instead of one update per edit
+        return removed
+
+    def reset(self, text):
+        # replace the whole text, keeping the same kind of storage
+        self.storage = type(self.storage)(text)
+        self._notify_reset()
+
+    def _notify_reset(self):
+        if self.listeners:
+            text = str(self)
+            for listener in self.listeners:
+                listener.on_reset(text)
+
+    def find(self, pattern, start=0):
+        return str(self).find(pattern, start)
+
+    def find_all(self, pattern):
+        """Offsets of all non-overlapping occurrences of pattern."""
+        if not pattern:
+            return []
+        text = str(self)
+        matches = []
+        pos = text.find(pattern)
+        while pos != -1:
+            matches.append(pos)
+            pos = text.find(pattern, pos + len(pattern))
+        return matches
+
+    def __len__(self):
+        return len(self.storage)
     
     def __str__(self):
-        return self.content
+        return str(self.storage)
     
 #=======================command interface==================
 class Command(ABC):
@@ -59,6 +308,12 @@ class Command(ABC):
         pass 
     def undo(self):
         pass 
+    def merge(self, other):
+        """Absorb `other` (executed right after self) into self. Returns True if merged."""
+        return False
+    def payload_size(self):
+        # number of characters of text this command keeps alive for undo/redo
+        return 0
 
 #=========================concrete commands===============
 
@@ -71,6 +326,15 @@ class InsertCommand(Command):
         self.receiver.insert(self.text,self.pos)
     def undo(self):
         self.receiver.delete(self.pos,self.pos+len(self.text))
+    def merge(self, other):
+        # typing: next insert starts exactly where this one ended
+        if (isinstance(other, InsertCommand) and other.receiver is self.receiver
+                and other.pos == self.pos + len(self.text)):
+            self.text += other.text
+            return True
+        return False
+    def payload_size(self):
+        return len(self.text)
 
 class DeleteCommand(Command):
     def __init__(self,receiver,start,end):
@@ -85,6 +349,22 @@ class DeleteCommand(Command):
     def undo(self):
         self.receiver.insert(self.deleted,self.start)
 
+    def merge(self, other):
+        if not isinstance(other, DeleteCommand) or other.receiver is not self.receiver:
+            return False
+        if other.end == self.start:  # backspace
+            self.start = other.start
+            self.deleted = other.deleted + self.deleted
+            return True
+        if other.start == self.start:  # forward delete
+            self.end += len(other.deleted)
+            self.deleted += other.deleted
+            return True
+        return False
+
+    def payload_size(self):
+        return len(self.deleted)
+
 class CopyCommand(Command):
     def __init__(self,receiver,start,end):
         self.receiver = receiver 
@@ -113,6 +393,9 @@ class PasteCommand(Command):
         end = start + len(self.pasted_text)
         self.receiver.delete(start, end)
 
+    def payload_size(self):
+        return len(self.pasted_text)
+
 class CutCommand(Command):
     def __init__(self,receiver,start,end):
         self.receiver=receiver
@@ -126,16 +409,151 @@ class CutCommand(Command):
     def undo(self):
         self.receiver.insert(self.cut_text,self.start)
 
+    def payload_size(self):
+        return len(self.cut_text)
+
+
+class MacroCommand(Command):
+    '''
+    Many edits applied as one transaction and undone as one history entry.
+    edits are (start, end, text) in the coordinates of the document before the macro runs:
+    insert -> (pos, pos, text), delete -> (start, end, ""), replace -> (start, end, text)
+    '''
+    def __init__(self, receiver, edits):
+        self.receiver = receiver
+        # stable sort keeps the given order of inserts at the same position
+        self.edits = sorted(edits, key=lambda edit: (edit[0], edit[1]))
+        self.inverse = []
+
+    @classmethod
+    def from_commands(cls, receiver, commands):
+        edits = []
+        for command in commands:
+            if isinstance(command, InsertCommand):
+                edits.append((command.pos, command.pos, command.text))
+            elif isinstance(command, DeleteCommand):
+                edits.append((command.start, command.end, ""))
+            else:
+                raise ValueError(f"{type(command).__name__} cannot be batched")
+        return cls(receiver, edits)
+
+    def _validate(self):
+        prev_end = 0
+        for start, end, _ in self.edits:
+            if start < prev_end or end < start or end > len(self.receiver):
+                raise ValueError(f"Invalid or overlapping edit ({start}, {end})")
+            prev_end = end
+
+    def execute(self):
+        self._validate()  # nothing is applied if any edit is bad
+        removed = self.receiver.replace_many(self.edits)
+        self.inverse = []
+        shift = 0
+        for (start, end, text), old in zip(self.edits, removed):
+            new_start = start + shift
+            self.inverse.append((new_start, new_start + len(text), old))
+            shift += len(text) - (end - start)
+
+    def undo(self):
+        self.receiver.replace_many(self.inverse)
+
+    def payload_size(self):
+        return sum(len(edit[2]) for edit in self.edits) + sum(len(edit[2]) for edit in self.inverse)
+
+
+class ReplaceAllCommand(MacroCommand):
+    # every match is replaced in one replace_many pass and undone as one unit
+    def __init__(self, receiver, pattern, replacement):
+        super().__init__(receiver, [])
+        self.pattern = pattern
+        self.replacement = replacement
+
+    def execute(self):
+        self.edits = [(pos, pos + len(self.pattern), self.replacement)
+                      for pos in self.receiver.find_all(self.pattern)]
+        super().execute()
+
+
+#===========History policy================
+class HistoryPolicy:
+    '''
+    Limits for the editor history. None means unlimited.
+    max_commands -> number of commands kept per stack
+    max_chars    -> total text payload (see Command.payload_size) kept per stack
+    coalesce     -> merge contiguous inserts/deletes into one command (one undo per typing burst)
+    '''
+    def __init__(self, max_commands=None, max_chars=None, coalesce=False):
+        self.max_commands = max_commands
+        self.max_chars = max_chars
+        self.coalesce = coalesce
+
+    def exceeded(self, count, chars):
+        return ((self.max_commands is not None and count > self.max_commands)
+                or (self.max_chars is not None and chars > self.max_chars))
+
+
+class CommandStack:
+    # stack of commands that evicts the oldest entries once the policy limits are crossed.
+    # the newest command is always kept, even if it alone is over max_chars.
+    def __init__(self, policy):
+        self.policy = policy
+        self._commands = deque()
+        self.payload = 0
+
+    def push(self, command):
+        self._commands.append(command)
+        self.payload += command.payload_size()
+        self.trim()
+
+    def pop(self):
+        command = self._commands.pop()
+        self.payload -= command.payload_size()
+        return command
+
+    def top(self):
+        return self._commands[-1] if self._commands else None
+
+    def trim(self):
+        while len(self._commands) > 1 and self.policy.exceeded(len(self._commands), self.payload):
+            evicted = self._commands.popleft()
+            self.payload -= evicted.payload_size()
+
+    def __len__(self):
+        return len(self._commands)
+
+    def __iter__(self):
+        return iter(self._commands)
+
 
 #===========Invoker =============Editor 
+# what happened to a command, as recorded in the optional journal
+OP_EXECUTE = 1
+OP_UNDO = 2
+OP_REDO = 3
+
 class Editor():
-    def __init__(self):
-        self.undo_stack = []
-        self.redo_stack =[]
+    def __init__(self, policy=None, journal=None):
+        self.policy = policy if policy is not None else HistoryPolicy()
+        self.undo_stack = CommandStack(self.policy)
+        self.redo_stack = CommandStack(self.policy)
+        self.journal = journal  # optional EditorJournal (editor_journal.py)
+
+    def _journal(self, op, command):
+        if self.journal is not None:
+            self.journal.record(op, command)
 
     def execute_command(self,command):
         command.execute()
-        self.undo_stack.append(command)
+        self._journal(OP_EXECUTE, command)
+        top = self.undo_stack.top()
+        if self.policy.coalesce and top is not None and top.merge(command):
+            self.undo_stack.payload += command.payload_size()
+            self.undo_stack.trim()
+        else:
+            self.undo_stack.push(command)
+
+    def execute_batch(self, receiver, edits):
+        self.execute_command(MacroCommand(receiver, edits))
 
     def undo(self):
         if not self.undo_stack:
@@ -143,7 +561,8 @@ class Editor():
             return
         command = self.undo_stack.pop()
         command.undo()
-        self.redo_stack.append(command)
+        self._journal(OP_UNDO, command)
+        self.redo_stack.push(command)
 
     def redo(self):
         if not self.redo_stack:
@@ -151,7 +570,8 @@ class Editor():
             return 
         command = self.redo_stack.pop()
         command.execute()
-        self.undo_stack.append(command)
+        self._journal(OP_REDO, command)
+        self.undo_stack.push(command)
 
 
 #client code    
@@ -209,6 +629,36 @@ if __name__ == "__main__":
         editor.redo()
     print("After redoing all:", doc)
 
+    # 12. Same commands on a piece table backed document
+    fast_doc = Document(PieceTableStorage("Hello World"))
+    editor.execute_command(CutCommand(fast_doc, 0, 6))
+    editor.execute_command(PasteCommand(fast_doc, len(fast_doc)))
+    print("Piece table document:", fast_doc)
+
+    # 13. Bounded history with coalescing: a typing burst is one undo entry
+    typing_doc = Document()
+    typing_editor = Editor(HistoryPolicy(max_commands=100, coalesce=True))
+    for i, ch in enumerate("typing burst"):
+        typing_editor.execute_command(InsertCommand(typing_doc, ch, i))
+    print("Typed:", typing_doc, "| history entries:", len(typing_editor.undo_stack))
+    typing_editor.undo()
+    print("After one undo:", repr(str(typing_doc)))
+
+    # 14. Batch edits: one rebuild of the document and one undo entry
+    batch_doc = Document(StringStorage("foo bar foo baz foo"))
+    batch_editor = Editor()
+    matches = [i for i in range(len(batch_doc)) if batch_doc.content.startswith("foo", i)]
+    batch_editor.execute_batch(batch_doc, [(i, i + 3, "qux") for i in matches])
+    print("After batch replace:", batch_doc)
+    batch_editor.undo()
+    print("After undoing batch:", batch_doc)
+
+    # 15. Replace all matches as one command
+    batch_editor.execute_command(ReplaceAllCommand(batch_doc, "foo", "bar"))
+    print("After replace all:", batch_doc, "| matches left:", batch_doc.find_all("foo"))
+    batch_editor.undo()
+    print("After undoing replace all:", batch_doc)
+
 
 '''
 Learnings:
@@ -219,6 +669,10 @@ each receiver will perform all commands business logic.
 
 command will have execute and undo methods. (mainly for undo methods , command isolated )
 
+macro command = many edits in one command, so the invoker sees one entry to undo/redo.
+
+receiver can hide how the text is stored (StringStorage / PieceTableStorage) - commands and invoker dont change.
+
 '''
         
 
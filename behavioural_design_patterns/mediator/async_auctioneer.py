@@ -0,0 +1,174 @@
+'''
+Asynchronous bid notification for the auction mediator.
+
+Auctioneer.place_bid calls notify on every other bidder inside the bid path, so a
+bid costs O(bidders) and one slow bidder stalls everyone. AsyncAuctioneer only
+records the bid and wakes a dispatcher task:
+
+place_bid  -> record in the BidBook, set the wake event (O(1))
+dispatcher -> once per round, puts the current price into every bidder's mailbox
+              (bids placed while a round runs are coalesced into the next one)
+mailbox    -> small bounded queue per bidder; when full the oldest update is
+              dropped, so a slow bidder only ever sees the latest prices
+consumer   -> one task per bidder delivering its mailbox (notify may be async)
+
+Bidders get "latest price" updates (the current best bid) instead of one call per bid.
+'''
+import asyncio
+import inspect
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+from online_auction_system import Auctioneer, Bid, FIRST_PRICE
+
+
+class Mailbox:
+    """Bounded, coalescing per-bidder queue of (bidder_name, amount) updates."""
+
+    def __init__(self, maxsize: int = 1):
+        self.pending = deque(maxlen=maxsize)
+        self.ready = asyncio.Event()
+        self.coalesced = 0
+
+    def put(self, update: Tuple[str, float]) -> bool:
+        """Queue update; returns True if an older undelivered update was dropped for it."""
+        dropped = len(self.pending) == self.pending.maxlen
+        if dropped:
+            self.coalesced += 1
+        self.pending.append(update)
+        self.ready.set()
+        return dropped
+
+    async def get(self) -> Tuple[str, float]:
+        while not self.pending:
+            self.ready.clear()
+            await self.ready.wait()
+        return self.pending.popleft()
+
+
+class AsyncAuctioneer(Auctioneer):
+    """Auctioneer whose notifications are delivered by asyncio tasks, off the bid path.
+
+    Use inside a running event loop: await start(), place bids, await close().
+    """
+
+    def __init__(self, pricing: str = FIRST_PRICE, sealed: bool = False,
+                 mailbox_size: int = 1, dispatch_chunk: int = 1000):
+        super().__init__(pricing, sealed)
+        self.mailbox_size = mailbox_size
+        # the dispatcher yields to the event loop every dispatch_chunk mailboxes
+        self.dispatch_chunk = dispatch_chunk
+        self.mailboxes: Dict[object, Mailbox] = {}
+        self.stats = {"bids": 0, "rounds": 0, "delivered": 0, "coalesced": 0, "failed": 0}
+        self._wake: Optional[asyncio.Event] = None
+        self._idle: Optional[asyncio.Event] = None
+        self._tasks: Dict[object, asyncio.Task] = {}
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._last_sent: Optional[Bid] = None
+        self._outstanding = 0  # updates queued but not delivered yet
+        self._dispatching = False
+
+    async def start(self):
+        self._wake = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        for bidder in self.bidders:
+            self._start_consumer(bidder)
+        self._dispatcher = asyncio.create_task(self._dispatch())
+
+    def register_bidder(self, bidder: "Bidder"):
+        super().register_bidder(bidder)
+        if self._dispatcher is not None:
+            self._start_consumer(bidder)
+
+    def _start_consumer(self, bidder):
+        box = self.mailboxes[bidder] = Mailbox(self.mailbox_size)
+        self._tasks[bidder] = asyncio.create_task(self._consume(bidder, box))
+
+    def _notify_others(self, bidder, bid: Bid):
+        if self._dispatcher is None:
+            raise RuntimeError("AsyncAuctioneer is not started")
+        self.stats["bids"] += 1
+        self._idle.clear()
+        self._wake.set()
+
+    async def _dispatch(self):
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            bid = self.book.best()
+            if bid is None or bid is self._last_sent:
+                self._check_idle()
+                continue  # e.g. a bid that did not beat the standing price
+            self._last_sent = bid
+            self._dispatching = True
+            update = (bid.name, bid.amount)
+            chunk = self.dispatch_chunk
+            for i, (bidder, box) in enumerate(list(self.mailboxes.items())):
+                if bidder.name != bid.name:
+                    if box.put(update):
+                        self.stats["coalesced"] += 1
+                    else:
+                        self._outstanding += 1
+                if i % chunk == chunk - 1:
+                    await asyncio.sleep(0)  # let bids in while a large round runs
+            self._dispatching = False
+            self.stats["rounds"] += 1
+            self._check_idle()
+
+    async def _consume(self, bidder, box: Mailbox):
+        while True:
+            name, amount = await box.get()
+            try:
+                result = bidder.notify(name, amount)
+                if inspect.isawaitable(result):
+                    await result
+                self.stats["delivered"] += 1
+            except Exception:
+                self.stats["failed"] += 1
+            self._outstanding -= 1
+            self._check_idle()
+
+    def _check_idle(self):
+        if not self._outstanding and not self._dispatching and not self._wake.is_set():
+            self._idle.set()
+
+    async def drain(self):
+        """Wait until every queued notification has been delivered."""
+        await self._idle.wait()
+
+    async def close(self):
+        if self._dispatcher is None:
+            return
+        await self.drain()
+        tasks = [self._dispatcher, *self._tasks.values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._dispatcher = None
+        self._tasks.clear()
+
+
+if __name__ == "__main__":
+    from online_auction_system import Bidder
+
+    class SlowBidder(Bidder):
+        async def notify(self, bidder_name, amount):
+            await asyncio.sleep(0.05)
+            print(f"{self.name} (slow) sees {bidder_name} at {amount}")
+
+    async def main():
+        auction = AsyncAuctioneer()
+        Bidder("Anusha", auction)
+        bhavani = Bidder("bhavani", auction)
+        SlowBidder("kalyani", auction)
+        await auction.start()
+        # bids return immediately; the slow bidder only sees the latest price
+        for amount in (100, 120, 150):
+            bhavani.bid(amount)
+            await asyncio.sleep(0)
+        await auction.close()
+        auction.announce_winner()
+        print(auction.stats)
+
+    asyncio.run(main())
@@ -0,0 +1,248 @@
+'''
+Auction house: many auctions hash-partitioned over worker processes.
+
+Every shard is a process owning the Auctioneer of each auction that hashes to it
+(crc32(auction_id) % shards), so bids for different auctions run on different cores
+instead of sharing one GIL. The parent buffers commands per shard and ships them as
+batches over a multiprocessing queue; each shard answers a batch with one reply
+(closed auctions, errors, timing), so IPC cost is per batch, not per bid.
+
+house = AuctionHouse(shards=4)
+house.open("lamp", pricing=SECOND_PRICE)
+house.bid("lamp", "anusha", 120)
+house.close("lamp")
+results = house.collect()      # [AuctionResult(...)]
+house.shutdown()
+
+usage: python auction_house.py [auctions] [bids] [shards]   (throughput demo)
+'''
+import multiprocessing as mp
+import os
+import queue
+import random
+import sys
+import time
+import zlib
+from typing import Dict, List, NamedTuple, Optional
+
+from online_auction_system import Auctioneer, FIRST_PRICE, SECOND_PRICE
+
+OPEN, BID, CLOSE, STOP = 0, 1, 2, 3
+
+
+class AuctionResult(NamedTuple):
+    auction_id: str
+    winner: Optional[str]
+    amount: Optional[float]
+    price: Optional[float]
+    bids: int
+
+
+class _BidRequest(NamedTuple):
+    # what Auctioneer.place_bid reads from a bidder
+    name: str
+    amount: float
+
+
+def shard_of(auction_id: str, shards: int) -> int:
+    # stable across processes, unlike hash() on str
+    return zlib.crc32(auction_id.encode()) % shards
+
+
+# -------------------------
+# Worker side
+# -------------------------
+def _shard_worker(shard: int, inbox, outbox):
+    auctions: Dict[str, Auctioneer] = {}
+    clock = time.perf_counter
+    while True:
+        batch_id, commands = inbox.get()
+        started = clock()
+        closed, errors, bids = [], [], 0
+        for command in commands:
+            op = command[0]
+            try:
+                if op == STOP:
+                    outbox.put((shard, batch_id, bids, clock() - started, closed, errors))
+                    return
+                if op == OPEN:
+                    if command[1] in auctions:
+                        raise ValueError(f"Auction {command[1]} is already open")
+                    auctions[command[1]] = Auctioneer(pricing=command[2], sealed=True)
+                    continue
+                auction = auctions.get(command[1])
+                if auction is None:
+                    errors.append((command, "unknown auction"))
+                elif op == BID:
+                    auction.place_bid(_BidRequest(command[2], command[3]))
+                    bids += 1
+                elif op == CLOSE:
+                    del auctions[command[1]]
+                    winner = auction.winner
+                    closed.append(AuctionResult(command[1], winner and winner.name, winner and winner.amount,
+                                                auction.book.clearing_price(auction.pricing),
+                                                auction.book.bid_count))
+            except ValueError as e:
+                errors.append((command, str(e)))
+            except Exception as e:
+                # a bad command must not take the shard (and every auction on it) down
+                errors.append((command, f"{type(e).__name__}: {e}"))
+        outbox.put((shard, batch_id, bids, clock() - started, closed, errors))
+
+
+# -------------------------
+# Parent side
+# -------------------------
+class ShardStats:
+    def __init__(self):
+        self.bids = 0
+        self.batches = 0
+        self.busy = 0.0  # seconds the shard spent processing
+        self.latencies: List[float] = []  # batch round trips (send -> reply)
+
+    def percentile(self, p: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+class AuctionHouse:
+    def __init__(self, shards: Optional[int] = None, batch_size: int = 1000, max_in_flight: int = 4,
+                 poll_interval: float = 1.0):
+        self.shards = shards or os.cpu_count() or 1
+        self.batch_size = batch_size
+        # how long to wait for a reply before checking that the shards are still alive
+        self.poll_interval = poll_interval
+        # batches a shard may have queued before the parent waits for replies (backpressure)
+        self.max_in_flight = max_in_flight
+        self.stats = [ShardStats() for _ in range(self.shards)]
+        self.errors: List[tuple] = []
+        self._results: List[AuctionResult] = []
+        self._buffers: List[list] = [[] for _ in range(self.shards)]
+        self._sent: Dict[tuple, float] = {}  # (shard, batch id) -> send time
+        self._in_flight = [0] * self.shards
+        self._next_batch = 0
+        self._outbox = mp.Queue()
+        self._inboxes = [mp.Queue() for _ in range(self.shards)]
+        self._workers = [mp.Process(target=_shard_worker, args=(i, self._inboxes[i], self._outbox), daemon=True)
+                         for i in range(self.shards)]
+        for worker in self._workers:
+            worker.start()
+
+    def open(self, auction_id: str, pricing: str = FIRST_PRICE):
+        self._send(auction_id, (OPEN, auction_id, pricing))
+
+    def bid(self, auction_id: str, bidder: str, amount: float):
+        self._send(auction_id, (BID, auction_id, bidder, amount))
+
+    def close(self, auction_id: str):
+        self._send(auction_id, (CLOSE, auction_id))
+
+    def _send(self, auction_id: str, command: tuple):
+        shard = shard_of(auction_id, self.shards)
+        buffer = self._buffers[shard]
+        buffer.append(command)
+        if len(buffer) >= self.batch_size:
+            self._flush_shard(shard)
+
+    def _flush_shard(self, shard: int):
+        if not self._buffers[shard]:
+            return
+        while self._in_flight[shard] >= self.max_in_flight:
+            self._receive()
+        batch_id = self._next_batch
+        self._next_batch += 1
+        self._sent[(shard, batch_id)] = time.perf_counter()
+        self._in_flight[shard] += 1
+        self._inboxes[shard].put((batch_id, self._buffers[shard]))
+        self._buffers[shard] = []
+
+    def flush(self):
+        for shard in range(self.shards):
+            self._flush_shard(shard)
+
+    def _receive(self):
+        while True:
+            try:
+                reply = self._outbox.get(timeout=self.poll_interval)
+                break
+            except queue.Empty:
+                self._check_workers()
+        shard, batch_id, bids, busy, closed, errors = reply
+        stats = self.stats[shard]
+        stats.latencies.append(time.perf_counter() - self._sent.pop((shard, batch_id)))
+        stats.bids += bids
+        stats.batches += 1
+        stats.busy += busy
+        self._in_flight[shard] -= 1
+        self._results.extend(closed)
+        self.errors.extend(errors)
+
+    def _check_workers(self):
+        for shard, worker in enumerate(self._workers):
+            if self._in_flight[shard] and not worker.is_alive():
+                raise RuntimeError(f"Shard {shard} exited (code {worker.exitcode}) "
+                                   f"with {self._in_flight[shard]} batch(es) unanswered")
+
+    def collect(self) -> List[AuctionResult]:
+        """Send everything buffered, wait for all replies and return auctions closed since the last call."""
+        self.flush()
+        while any(self._in_flight):
+            self._receive()
+        results, self._results = self._results, []
+        return results
+
+    def shutdown(self):
+        self.collect()
+        for shard, inbox in enumerate(self._inboxes):
+            self._sent[(shard, -1)] = time.perf_counter()
+            self._in_flight[shard] += 1
+            inbox.put((-1, [(STOP,)]))
+        while any(self._in_flight):
+            self._receive()
+        for worker in self._workers:
+            worker.join()
+
+    def report(self) -> str:
+        lines = []
+        for shard, stats in enumerate(self.stats):
+            rate = stats.bids / stats.busy if stats.busy else 0.0
+            lines.append(f"shard {shard}: {stats.bids:>9,} bids  {rate:>12,.0f} bids/s busy  "
+                         f"batch latency p50 {stats.percentile(50) * 1e3:.1f}ms p99 {stats.percentile(99) * 1e3:.1f}ms")
+        return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    auctions = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000
+    bids = int(sys.argv[2]) if len(sys.argv) > 2 else 500_000
+    shards = int(sys.argv[3]) if len(sys.argv) > 3 else None
+    rng = random.Random(0)
+    ids = [f"item-{i}" for i in range(auctions)]
+    stream = [(rng.choice(ids), f"bidder-{rng.randrange(10_000)}", rng.randint(1, 10_000)) for _ in range(bids)]
+
+    # single process baseline
+    started = time.perf_counter()
+    local = {auction_id: Auctioneer(pricing=SECOND_PRICE, sealed=True) for auction_id in ids}
+    for auction_id, name, amount in stream:
+        local[auction_id].place_bid(_BidRequest(name, amount))
+    local_seconds = time.perf_counter() - started
+
+    house = AuctionHouse(shards)
+    started = time.perf_counter()
+    for auction_id in ids:
+        house.open(auction_id, pricing=SECOND_PRICE)
+    for auction_id, name, amount in stream:
+        house.bid(auction_id, name, amount)
+    for auction_id in ids:
+        house.close(auction_id)
+    results = house.collect()
+    house_seconds = time.perf_counter() - started
+    house.shutdown()
+
+    assert len(results) == auctions and not house.errors
+    assert all(r.price == local[r.auction_id].book.clearing_price(SECOND_PRICE) for r in results)
+    print(f"{bids:,} bids over {auctions:,} auctions")
+    print(f"single process : {bids / local_seconds:,.0f} bids/s")
+    print(f"{house.shards} shard(s)     : {bids / house_seconds:,.0f} bids/s end to end")
+    print(house.report())
@@ -0,0 +1,258 @@
+'''
+Durable event log for the auction mediator.
+
+Registrations, bids and the close of an Auctioneer are appended to a binary log.
+Records are buffered and committed in groups (one write + fsync per `group_size`
+records or per `commit_interval` seconds, whichever comes first), so durability
+costs one fsync per group instead of one per bid. The interval also holds when bids
+stop arriving: a flusher thread commits a group that has waited `commit_interval`
+(flusher=False leaves that to the caller, via flush_due()). Every `snapshot_every` records
+the auction state (standing bids, bidders, closed flag) goes to a snapshot file
+together with the log offset it belongs to.
+
+After a crash: load the snapshot, replay the log tail behind it. Records that were
+buffered but not committed yet are lost - at most one group, call commit() when a
+caller needs a bid to be durable before answering.
+
+log record  = header (event kind, payload length, crc32 of payload) + payload
+snapshot    = log offset + pricing + flags + bid count + bidders + standing bids
+'''
+import os
+import struct
+import threading
+import time
+import zlib
+
+from online_auction_system import Bid, EV_BID, EV_CLOSE, EV_REGISTER
+
+_HEADER = struct.Struct("<BII")
+_INT = struct.Struct("<i")
+_COUNT = struct.Struct("<Q")
+_AMOUNT = struct.Struct("<d")
+
+
+#==================encoding helpers==================
+def _pack_str(text):
+    data = text.encode("utf-8")
+    return _INT.pack(len(data)) + data
+
+
+class _Reader:
+    def __init__(self, data):
+        self.data = data
+        self.pos = 0
+
+    def _unpack(self, fmt):
+        value = fmt.unpack_from(self.data, self.pos)[0]
+        self.pos += fmt.size
+        return value
+
+    def int(self):
+        return self._unpack(_INT)
+
+    def count(self):
+        return self._unpack(_COUNT)
+
+    def amount(self):
+        return self._unpack(_AMOUNT)
+
+    def str(self):
+        length = self.int()
+        text = bytes(self.data[self.pos:self.pos + length]).decode("utf-8")
+        self.pos += length
+        return text
+
+
+#==================log==================
+class AuctionEventLog:
+    def __init__(self, path, snapshot_every=10000, group_size=256, commit_interval=0.01, sync=True,
+                 flusher=True):
+        self.path = path
+        self.snapshot_path = path + ".snap"
+        self.snapshot_every = snapshot_every
+        self.group_size = group_size
+        self.commit_interval = commit_interval
+        self.sync = sync  # fsync on commit (survives power loss, not only process crash)
+        self.bidders = set()  # bidder names known to the auction (filled by recover)
+        self.commits = 0
+        self._file = open(path, "ab")
+        self._pending = []
+        self._first_pending = 0.0
+        self._since_snapshot = 0
+        self._has_snapshot = os.path.exists(self.snapshot_path)
+        self._lock = threading.RLock()  # the flusher thread commits too
+        self._stop = threading.Event()
+        self._flusher = None
+        if flusher and commit_interval:
+            self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self):
+        # checks twice per interval, so a group waits at most ~1.5 x commit_interval
+        while not self._stop.wait(self.commit_interval / 2):
+            self.flush_due()
+
+    def flush_due(self):
+        """Commit the buffered group if it has waited commit_interval; returns True if it did."""
+        with self._lock:
+            if self._pending and time.perf_counter() - self._first_pending >= self.commit_interval:
+                self.commit()
+                return True
+        return False
+
+    def record(self, kind, auction, name="", amount=0.0):
+        with self._lock:
+            self._record(kind, auction, name, amount)
+
+    def _record(self, kind, auction, name, amount):
+        if kind == EV_BID:
+            payload = _pack_str(name) + _AMOUNT.pack(amount)
+        elif kind == EV_REGISTER:
+            payload = _pack_str(name)
+            self.bidders.add(name)
+        else:
+            payload = b""
+        if not self._pending:
+            self._first_pending = time.perf_counter()
+        self._pending.append(_HEADER.pack(kind, len(payload), zlib.crc32(payload)) + payload)
+        self._since_snapshot += 1
+        if (len(self._pending) >= self.group_size or kind == EV_CLOSE
+                or time.perf_counter() - self._first_pending >= self.commit_interval):
+            self.commit()
+        # the event is already applied, so a snapshot belongs to the offset after its record;
+        # the first one gives the log a base state, so a replay never depends on what was in memory
+        if not self._has_snapshot or self._since_snapshot >= self.snapshot_every:
+            self.snapshot(auction)
+
+    def commit(self):
+        """Write and fsync every buffered record (one group)."""
+        with self._lock:
+            if not self._pending:
+                return
+            self._file.write(b"".join(self._pending))
+            self._file.flush()
+            if self.sync:
+                os.fsync(self._file.fileno())
+            self._pending.clear()
+            self.commits += 1
+
+    def snapshot(self, auction):
+        with self._lock:
+            self._snapshot(auction)
+
+    def _snapshot(self, auction):
+        self.commit()
+        offset = self._file.tell()
+        bids = auction.book.standing_bids()
+        parts = [_COUNT.pack(offset), _pack_str(auction.pricing),
+                 bytes([auction.sealed, auction.closed]), _COUNT.pack(auction.book.bid_count),
+                 _INT.pack(len(self.bidders))]
+        parts += [_pack_str(name) for name in self.bidders]
+        parts.append(_INT.pack(len(bids)))
+        parts += [_pack_str(bid.name) + _AMOUNT.pack(bid.amount) + _COUNT.pack(bid.seq) for bid in bids]
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(b"".join(parts))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)  # atomic: old snapshot stays valid until here
+        self._has_snapshot = True
+        self._since_snapshot = 0
+
+    def recover(self, auction):
+        """Rebuild auction from the latest snapshot plus the log tail. Returns records replayed.
+
+        Bidder objects are not restored (they are clients); their names end up in self.bidders.
+        """
+        if not self._has_snapshot:
+            return 0
+        with open(self.snapshot_path, "rb") as f:
+            reader = _Reader(f.read())
+        offset = reader.count()
+        auction.pricing = reader.str()
+        flags = reader.data[reader.pos:reader.pos + 2]
+        reader.pos += 2
+        auction.sealed, auction.closed = bool(flags[0]), bool(flags[1])
+        bid_count = reader.count()
+        self.bidders = {reader.str() for _ in range(reader.int())}
+        bids = []
+        for _ in range(reader.int()):
+            name = reader.str()
+            amount = reader.amount()
+            bids.append(Bid(amount, reader.count(), name))
+        auction.book.restore(bids, bid_count)
+
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+        replayed = 0
+        pos = 0
+        while pos + _HEADER.size <= len(data):
+            kind, length, crc = _HEADER.unpack_from(data, pos)
+            body = pos + _HEADER.size
+            if body + length > len(data) or zlib.crc32(data[body:body + length]) != crc:
+                break  # torn write from a crash
+            reader = _Reader(data[body:body + length])
+            if kind == EV_BID:
+                name = reader.str()
+                auction.book.add(name, reader.amount())
+            elif kind == EV_REGISTER:
+                self.bidders.add(reader.str())
+            elif kind == EV_CLOSE:
+                auction.closed = True
+            pos = body + length
+            replayed += 1
+        if pos < len(data):
+            self._file.flush()
+            os.truncate(self.path, offset + pos)  # drop the broken tail so new records stay readable
+        self._since_snapshot = replayed
+        return replayed
+
+    def close(self):
+        if self._flusher is not None:
+            self._stop.set()
+            self._flusher.join()
+        self.commit()
+        self._file.close()
+
+
+# ======== Client Code ========
+if __name__ == "__main__":
+    import tempfile
+    from online_auction_system import Auctioneer, Bidder, SECOND_PRICE
+
+    path = os.path.join(tempfile.mkdtemp(), "auction.log")
+
+    # session 1: bids are logged, snapshot every 4 records
+    auction = Auctioneer(pricing=SECOND_PRICE, sealed=True, log=AuctionEventLog(path, snapshot_every=4))
+    anusha = Bidder("Anusha", auction)
+    bhavani = Bidder("bhavani", auction)
+    for bidder, amount in ((anusha, 100), (bhavani, 120), (anusha, 150), (bhavani, 140), (anusha, 90)):
+        bidder.bid(amount)
+    auction.log.commit()  # make the last group durable before "crashing"
+    print("Before crash:", auction.top_bids(2))
+
+    # session 2: restart and recover
+    recovered = Auctioneer()
+    log = AuctionEventLog(path, snapshot_every=4)
+    print("Replayed records:", log.recover(recovered))
+    print("After recovery:", recovered.top_bids(2), "| bidders:", sorted(log.bidders))
+    recovered.log = log
+    recovered.announce_winner()
+    recovered.close()
+    log.close()
+
+    # a session shorter than snapshot_every recovers the same bids (amounts and sequence numbers)
+    path = os.path.join(tempfile.mkdtemp(), "short.log")
+    auction = Auctioneer(pricing=SECOND_PRICE, sealed=True, log=AuctionEventLog(path, snapshot_every=1000))
+    anusha = Bidder("Anusha", auction)
+    anusha.bid(100)
+    Bidder("bhavani", auction).bid(120)
+    auction.log.close()
+    recovered = Auctioneer(pricing=SECOND_PRICE)
+    log = AuctionEventLog(path, snapshot_every=1000)
+    log.recover(recovered)
+    assert recovered.top_bids(5) == auction.top_bids(5), recovered.top_bids(5)
+    assert recovered.book.bid_count == auction.book.bid_count == 2
+    print("Short session recovered:", recovered.top_bids(5))
+    log.close()
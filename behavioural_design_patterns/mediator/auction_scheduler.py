@@ -0,0 +1,239 @@
+'''
+Close-time scheduler for auctions, with soft-close (anti-sniping) extensions.
+
+Deadlines live in a hierarchical timer wheel: level 0 has one slot per tick, every
+higher level one slot per full turn of the level below. Adding, cancelling or moving
+a timer is O(1) (a dict insert/delete in one slot); a slot of a higher level is
+cascaded down once when the wheel reaches it, so each timer is touched O(levels)
+times in total. advance(now) only visits the slots of the ticks that passed - nothing
+polls the auctions.
+
+Soft close: a bid that lands within `extension_window` seconds of the deadline moves
+the deadline to bid time + `extension`, so sniping in the last second does not work.
+When a deadline passes the scheduler closes the auction and announces the winner.
+
+usage: python auction_scheduler.py [auctions]   (demo + timing with a virtual clock)
+'''
+import math
+import time
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class TimerWheel:
+    """Hierarchical timing wheel keyed by any hashable; deadlines are integer ticks."""
+
+    def __init__(self, slot_bits: int = 8, levels: int = 4):
+        self.slot_bits = slot_bits
+        self.levels = levels
+        self._mask = (1 << slot_bits) - 1
+        self._wheels: List[List[Dict[Hashable, int]]] = [[{} for _ in range(1 << slot_bits)]
+                                                          for _ in range(levels)]
+        self._where: Dict[Hashable, Tuple[int, int]] = {}  # key -> (level, slot)
+        self.current = 0  # next tick to process
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def __contains__(self, key) -> bool:
+        return key in self._where
+
+    def add(self, key: Hashable, tick: int):
+        """Schedule key at tick (moves it if it is already scheduled)."""
+        if key in self._where:
+            self.cancel(key)
+        tick = max(tick, self.current)
+        # level = highest slot_bits group where tick and current differ
+        level = ((tick ^ self.current).bit_length() - 1) // self.slot_bits if tick != self.current else 0
+        # deadlines past the top level's range wait there for extra turns
+        level = min(level, self.levels - 1)
+        slot = (tick >> (self.slot_bits * level)) & self._mask
+        self._wheels[level][slot][key] = tick
+        self._where[key] = (level, slot)
+
+    def cancel(self, key: Hashable) -> bool:
+        where = self._where.pop(key, None)
+        if where is None:
+            return False
+        level, slot = where
+        del self._wheels[level][slot][key]
+        return True
+
+    def advance(self, tick: int) -> List[Hashable]:
+        """Process every tick up to and including `tick`; returns the keys that expired, in order."""
+        expired = []
+        bits, mask = self.slot_bits, self._mask
+        while self.current <= tick:
+            if not self._where:
+                self.current = tick + 1  # nothing scheduled: jump
+                break
+            now = self.current
+            # cascade: when the lower levels wrap, the next slot of a higher level moves down
+            for level in range(self.levels - 1, 0, -1):
+                if now & ((1 << (bits * level)) - 1) == 0:
+                    slot = self._wheels[level][(now >> (bits * level)) & mask]
+                    if slot:
+                        entries = list(slot.items())
+                        slot.clear()
+                        for key, deadline in entries:
+                            del self._where[key]
+                            self.add(key, deadline)
+            slot = self._wheels[0][now & mask]
+            if slot:
+                expired.extend(slot)
+                for key in slot:
+                    del self._where[key]
+                slot.clear()
+            self.current = now + 1
+        return expired
+
+
+class AuctionScheduler:
+    """Closes scheduled auctions when their deadline passes; extends deadlines on late bids.
+
+    Time is whatever `clock` returns (seconds); pass a virtual clock for simulations.
+    """
+
+    def __init__(self, tick: float = 0.1, extension_window: float = 0.0, extension: float = 0.0,
+                 clock: Callable[[], float] = time.monotonic,
+                 on_close: Optional[Callable[[object], None]] = None):
+        self.tick = tick
+        self.extension_window = extension_window
+        self.extension = extension
+        self.clock = clock
+        # called with each auction after it is closed; default announces the winner
+        self.on_close = on_close or (lambda auction: auction.announce_winner())
+        self.wheel = TimerWheel()
+        self.wheel.current = self._tick_of(clock())
+        self.deadlines: Dict[object, float] = {}
+        self.extensions = 0
+        self.closed = 0
+
+    def _tick_of(self, seconds: float) -> int:
+        # round up, so an auction never closes before its deadline
+        return math.ceil(seconds / self.tick)
+
+    def schedule(self, auction, close_at: float):
+        self.deadlines[auction] = close_at
+        self.wheel.add(auction, self._tick_of(close_at))
+        if self not in auction.listeners:
+            auction.listeners.append(self)
+
+    def cancel(self, auction):
+        self.deadlines.pop(auction, None)
+        self.wheel.cancel(auction)
+        if self in auction.listeners:
+            auction.listeners.remove(self)
+
+    def before_bid(self, auction, bidder):
+        # past the deadline but before the next advance(): too late, not a soft-close extension
+        close_at = self.deadlines.get(auction)
+        if close_at is not None and self.clock() >= close_at:
+            raise ValueError("Auction has ended")
+
+    def on_bid(self, auction, bid):
+        close_at = self.deadlines.get(auction)
+        if close_at is None or not self.extension_window:
+            return
+        now = self.clock()
+        if close_at - now <= self.extension_window:
+            # soft close: a late bid keeps the auction open a little longer
+            new_close = max(close_at, now + self.extension)
+            if new_close != close_at:
+                self.deadlines[auction] = new_close
+                self.wheel.add(auction, self._tick_of(new_close))
+                self.extensions += 1
+
+    def advance(self, now: Optional[float] = None) -> List[object]:
+        """Close every auction whose deadline has passed; returns them in deadline order."""
+        now = self.clock() if now is None else now
+        closed = self.wheel.advance(math.floor(now / self.tick))
+        for auction in closed:
+            del self.deadlines[auction]
+            auction.listeners.remove(self)
+            auction.close()
+            self.on_close(auction)
+        self.closed += len(closed)
+        return closed
+
+    def run(self):
+        """Block until every scheduled auction is closed (real clock)."""
+        while self.deadlines:
+            time.sleep(self.tick)
+            self.advance()
+
+
+if __name__ == "__main__":
+    import random
+    import sys
+    from online_auction_system import Auctioneer, Bidder
+
+    class VirtualClock:
+        def __init__(self):
+            self.now = 0.0
+
+        def __call__(self):
+            return self.now
+
+    # demo: a snipe 1s before the deadline extends the auction by 30s
+    clock = VirtualClock()
+    scheduler = AuctionScheduler(tick=1.0, extension_window=60.0, extension=30.0, clock=clock)
+    auction = Auctioneer(sealed=True)
+    anusha, bhavani = Bidder("Anusha", auction), Bidder("bhavani", auction)
+    scheduler.schedule(auction, close_at=300.0)
+    anusha.bid(100)
+    clock.now = 299.0
+    bhavani.bid(120)
+    print("deadline after snipe:", scheduler.deadlines[auction])
+    print("closed at 300s:", scheduler.advance(300.0))
+    clock.now = 320.0
+    anusha.bid(130)
+    clock.now = 400.0  # past the deadline, before the scheduler's next advance()
+    try:
+        bhavani.bid(140)
+    except ValueError as e:
+        print("late bid rejected:", e)
+    scheduler.advance(400.0)
+
+    # timing: many auctions with random deadlines over a day, late bids extend some of them
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    rng = random.Random(1)
+    clock = VirtualClock()
+    scheduler = AuctionScheduler(tick=0.1, extension_window=30.0, extension=30.0, clock=clock,
+                                 on_close=lambda auction: None)
+    auctions = [Auctioneer(sealed=True) for _ in range(count)]
+    started = time.perf_counter()
+    for a in auctions:
+        scheduler.schedule(a, rng.uniform(60.0, 86_400.0))
+    schedule_seconds = time.perf_counter() - started
+
+    bidders = [Bidder(f"b{i}", auctions[0]) for i in range(100)]
+    bid_seconds = 0.0
+    bids = rejected = 0
+    advance_seconds = 0.0
+    while scheduler.deadlines:
+        clock.now += 60.0
+        for _ in range(20):
+            # bids on auctions that are about to close
+            target = rng.choice(auctions)
+            close_at = scheduler.deadlines.get(target)
+            if close_at is None:
+                continue
+            clock.now, saved = max(clock.now, close_at - rng.uniform(0.0, 30.0)), clock.now
+            bidder = rng.choice(bidders)
+            bidder.amount = rng.randint(1, 1000)
+            t0 = time.perf_counter()
+            try:
+                target.place_bid(bidder)
+                bids += 1
+            except ValueError:
+                rejected += 1  # deadline passed, advance() has not closed it yet
+            bid_seconds += time.perf_counter() - t0
+            clock.now = saved
+        t0 = time.perf_counter()
+        scheduler.advance()
+        advance_seconds += time.perf_counter() - t0
+
+    print(f"{count:,} auctions: schedule {schedule_seconds / count * 1e6:.2f}us each, "
+          f"bid incl. extension check {bid_seconds / max(1, bids + rejected) * 1e6:.2f}us "
+          f"({scheduler.extensions:,} extensions, {rejected:,} late bids rejected), "
+          f"advance+close over a virtual day {advance_seconds:.2f}s ({scheduler.closed:,} closed)")
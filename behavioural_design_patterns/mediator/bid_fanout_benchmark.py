@@ -0,0 +1,99 @@
+"""Benchmark: bid notification fan-out with many bidders.
+
+Places bids from random bidders in an auction with `bidders` registered bidders
+(a few of them slow, awaiting 10ms per notification) and compares
+  - Auctioneer: synchronous notify of every bidder inside place_bid
+  - AsyncAuctioneer: O(1) place_bid, coalesced per-bidder mailboxes
+Reports bids/s, place_bid latency and (async) how stale the price a bidder sees is.
+
+usage: python bid_fanout_benchmark.py [bidders] [bids]
+"""
+import asyncio
+import random
+import sys
+import time
+
+from async_auctioneer import AsyncAuctioneer
+from online_auction_system import Auctioneer, Bidder
+
+
+class QuietBidder(Bidder):
+    """Records what it was told instead of printing."""
+
+    def __init__(self, name, mediator):
+        super().__init__(name, mediator)
+        self.seen = 0
+        self.last_amount = 0
+
+    def notify(self, bidder_name, amount):
+        self.seen += 1
+        self.last_amount = amount
+
+
+class SlowAsyncBidder(QuietBidder):
+    async def notify(self, bidder_name, amount):
+        await asyncio.sleep(0.01)
+        super().notify(bidder_name, amount)
+
+
+def percentile(samples, p):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(p / 100 * len(samples)))]
+
+
+def bench_sync(bidders: int, bids: int, seed: int = 1):
+    auction = Auctioneer()
+    # the sync auctioneer would block on slow bidders, so every bidder is fast here
+    people = [QuietBidder(f"b{i}", auction) for i in range(bidders)]
+    rng = random.Random(seed)
+    latencies = []
+    started = time.perf_counter()
+    for amount in range(1, bids + 1):
+        t0 = time.perf_counter()
+        rng.choice(people).bid(amount)
+        latencies.append(time.perf_counter() - t0)
+    return bids / (time.perf_counter() - started), latencies
+
+
+async def bench_async(bidders: int, bids: int, slow: int, rate: float, seed: int = 1):
+    auction = AsyncAuctioneer()
+    people = [QuietBidder(f"b{i}", auction) for i in range(bidders - slow)]
+    people += [SlowAsyncBidder(f"s{i}", auction) for i in range(slow)]
+    await auction.start()
+    rng = random.Random(seed)
+    latencies = []
+    staleness = []
+    interval = 1.0 / rate
+    started = time.perf_counter()
+    for amount in range(1, bids + 1):
+        t0 = time.perf_counter()
+        rng.choice(people).bid(amount)
+        latencies.append(time.perf_counter() - t0)
+        if amount % 100 == 0:
+            # pace the bids at `rate` per second, letting the notification tasks run meanwhile
+            await asyncio.sleep(max(0.0, started + amount * interval - time.perf_counter()))
+            probe = rng.choice(people)
+            staleness.append(amount - probe.last_amount)
+    placed = time.perf_counter() - started
+    await auction.close()
+    total = time.perf_counter() - started
+    return bids / placed, latencies, staleness, total, auction.stats
+
+
+if __name__ == "__main__":
+    bidders = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    bids = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    slow = 10
+
+    sync_bids = min(bids, 2_000)
+    rate, latencies = bench_sync(bidders, sync_bids)
+    print(f"{bidders} bidders")
+    print(f"  Auctioneer (sync)     : {rate:,.0f} bids/s  place_bid p50 {percentile(latencies, 50) * 1e6:.0f}us "
+          f"p99 {percentile(latencies, 99) * 1e6:.0f}us  ({sync_bids} bids)")
+
+    for target in (1_000, 5_000, float("inf")):
+        rate, latencies, staleness, total, stats = asyncio.run(bench_async(bidders, bids, slow, target))
+        print(f"  AsyncAuctioneer @ {target:>6,.0f}/s: {rate:,.0f} bids/s  place_bid p50 "
+              f"{percentile(latencies, 50) * 1e6:.1f}us p99 {percentile(latencies, 99) * 1e6:.1f}us  "
+              f"price staleness p50 {percentile(staleness, 50)} bids  ({bids} bids, drained in {total:.2f}s)")
+        print(f"    rounds {stats['rounds']:,}  delivered {stats['delivered']:,}  coalesced {stats['coalesced']:,}")
@@ -14,8 +14,20 @@ Current highest bid
 Notifies all bidders of new highest bid
 
 Declares winner when auction ends
+
+Bids are kept in an order book (BidBook): every place_bid creates an immutable Bid
+record, the best bid is at the top of a max-heap, and top-K / second price queries
+support sealed-bid and Vickrey (second price) auctions.
 '''
+import heapq
 from abc import ABC,abstractmethod
+from typing import Dict, List, NamedTuple, Optional
+
+FIRST_PRICE = "first_price"
+SECOND_PRICE = "second_price"  # Vickrey: winner pays the second highest bid
+
+# event kinds written to an auction log (see auction_log.py)
+EV_REGISTER, EV_BID, EV_CLOSE = 1, 2, 3
 
 #collegue (Bidder)
 class Colleague(ABC):
@@ -41,24 +53,160 @@ class AuctionMediator(ABC):
     def announce_winner(self):
         pass
 
-class Auctioneer(AuctionMediator):
+# immutable bid record; seq orders equal amounts (earlier bid wins the tie)
+class Bid(NamedTuple):
+    amount: float
+    seq: int
+    name: str
+
+
+class BidBook:
+    """Order book of bids: O(log n) insert, O(1) best bid, top-K without sorting everything.
+
+    Only a bidder's best bid counts, so a later lower bid never lowers the standing price.
+    Superseded bids stay in the heap as stale entries and are dropped lazily.
+    """
+
     def __init__(self):
+        self._heap: List[tuple] = []  # (-amount, seq, bid)
+        self._best: Dict[str, Bid] = {}  # bidder name -> best bid
+        self._stale = 0
+        self.bid_count = 0
+
+    def __len__(self) -> int:
+        # number of bidders with a bid
+        return len(self._best)
+
+    def add(self, name: str, amount: float) -> Bid:
+        bid = Bid(amount, self.bid_count, name)
+        self.bid_count += 1
+        current = self._best.get(name)
+        if current is not None and current.amount >= amount:
+            return bid  # recorded, but does not beat the bidder's own best bid
+        if current is not None:
+            self._stale += 1
+        self._best[name] = bid
+        heapq.heappush(self._heap, (-amount, bid.seq, bid))
+        if self._stale > 64 and self._stale > len(self._best):
+            self._compact()
+        return bid
+
+    def _compact(self):
+        self._heap = [entry for entry in self._heap if self._best.get(entry[2].name) is entry[2]]
+        heapq.heapify(self._heap)
+        self._stale = 0
+
+    def best(self) -> Optional[Bid]:
+        heap = self._heap
+        while heap and self._best.get(heap[0][2].name) is not heap[0][2]:
+            heapq.heappop(heap)
+            self._stale -= 1
+        return heap[0][2] if heap else None
+
+    def best_of(self, name: str) -> Optional[Bid]:
+        return self._best.get(name)
+
+    def standing_bids(self) -> List[Bid]:
+        """Every bidder's best bid, in no particular order."""
+        return list(self._best.values())
+
+    def restore(self, bids: List[Bid], bid_count: int):
+        """Load standing bids (e.g. from a snapshot); keeps their original seq numbers."""
+        self._best = {bid.name: bid for bid in bids}
+        self._heap = [(-bid.amount, bid.seq, bid) for bid in bids]
+        heapq.heapify(self._heap)
+        self._stale = 0
+        self.bid_count = bid_count
+
+    def top(self, k: int) -> List[Bid]:
+        """k best bids (one per bidder), best first; walks the heap instead of sorting it."""
+        heap, best = self._heap, self._best
+        result: List[Bid] = []
+        if not heap or k <= 0:
+            return result
+        frontier = [(heap[0][0], heap[0][1], 0)]
+        while frontier and len(result) < k:
+            _, _, i = heapq.heappop(frontier)
+            bid = heap[i][2]
+            if best.get(bid.name) is bid:
+                result.append(bid)
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child][0], heap[child][1], child))
+        return result
+
+    def clearing_price(self, pricing: str = FIRST_PRICE) -> Optional[float]:
+        """What the winner pays: their own bid, or the runner-up's bid for SECOND_PRICE."""
+        top = self.top(2)
+        if not top:
+            return None
+        if pricing == SECOND_PRICE and len(top) > 1:
+            return top[1].amount
+        return top[0].amount
+
+
+class Auctioneer(AuctionMediator):
+    def __init__(self, pricing: str = FIRST_PRICE, sealed: bool = False, log=None):
+        if pricing not in (FIRST_PRICE, SECOND_PRICE):
+            raise ValueError(f"Unknown pricing {pricing!r}")
         self.bidders=[] 
-        self.winner=None 
-    def register_bidder(self,bidder:Bidder):
+        self.book = BidBook()
+        self.pricing = pricing
+        # sealed bid: nobody is told about other bids
+        self.sealed = sealed
+        self.closed = False
+        # optional durable event log (AuctionEventLog)
+        self.log = log
+        # objects with before_bid(auction, bidder), which may reject a bid with ValueError,
+        # and on_bid(auction, bid), told about every accepted bid (e.g. AuctionScheduler)
+        self.listeners = []
+    @property
+    def winner(self) -> Optional[Bid]:
+        return self.book.best()
+    def register_bidder(self,bidder:"Bidder"):
         self.bidders.append(bidder)
-    def place_bid(self,bidder):
-        if not self.winner or bidder.amount>self.winner.amount:
-            self.winner=bidder
+        if self.log is not None:
+            self.log.record(EV_REGISTER, self, bidder.name)
+    def place_bid(self,bidder) -> Bid:
+        if self.closed:
+            raise ValueError("Auction is closed")
+        if bidder.amount <= 0:
+            raise ValueError("Bid amount must be positive")
+        for listener in self.listeners:
+            listener.before_bid(self, bidder)
+        bid = self.book.add(bidder.name, bidder.amount)
+        if self.log is not None:
+            self.log.record(EV_BID, self, bidder.name, bidder.amount)
+        for listener in self.listeners:
+            listener.on_bid(self, bid)
+        if not self.sealed:
+            self._notify_others(bidder, bid)
+        return bid
+
+    def _notify_others(self, bidder, bid: Bid):
+        # synchronous fan-out: O(bidders) inside the bid path (see AsyncAuctioneer)
         for b in self.bidders:
             if b!=bidder:
                 b.notify(bidder.name,bidder.amount)
 
+    def top_bids(self, k: int) -> List[Bid]:
+        return self.book.top(k)
+
+    def close(self) -> Optional[Bid]:
+        """End the auction: no more bids are accepted. Returns the winning bid."""
+        if not self.closed:
+            self.closed = True
+            if self.log is not None:
+                self.log.record(EV_CLOSE, self)
+        return self.winner
+
     def announce_winner(self):
-        if not self.winner:
+        winner = self.winner
+        if not winner:
             print("No one bid as of now...")
         else:
-            print("Winner is ",self.winner.name,"with amount",self.winner.amount)
+            print("Winner is ",winner.name,"with amount",winner.amount,
+                  "paying",self.book.clearing_price(self.pricing))
 
     
 class Bidder(Colleague):
@@ -98,3 +246,13 @@ if __name__ == "__main__":
     # Announce final winner
     auction.announce_winner()
 
+    # sealed-bid second price (Vickrey) auction: no notifications, winner pays the runner-up's bid
+    print("\n--- Vickrey auction ---")
+    vickrey = Auctioneer(pricing=SECOND_PRICE, sealed=True)
+    bidders = [Bidder(name, vickrey) for name in ("Anusha", "bhavani", "kalyani")]
+    for bidder, amount in zip(bidders, (300, 250, 280)):
+        bidder.bid(amount)
+    bidders[0].bid(150)  # a later lower bid does not lower Anusha's standing bid
+    print("Top 2:", [(bid.name, bid.amount) for bid in vickrey.top_bids(2)])
+    vickrey.announce_winner()
+
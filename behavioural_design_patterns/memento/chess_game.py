@@ -3,31 +3,106 @@ Memento Design Pattern Example:
 Dynamic Chess Game (n x n board) with Undo functionality.
 
 Below code is not complete design of chess game...It just shows that chess can be built efficiently with memento design pattern.
+
+Delta mode (ChessGame(n, keyframe_every=K)): save() records only the squares changed since the
+previous save plus the turn, and a full board every K saves. History keeps one working board
+at the newest memento and moves it back with reverse deltas on undo; any older point is
+rebuilt from the nearest keyframe plus at most K - 1 deltas.
+
+Every position has a 64-bit Zobrist hash (xor of one random key per occupied square + one
+for Black to move), updated in O(1) per move. History counts positions by hash, so
+"has this position occurred before, and how often?" is a dict lookup, and mementos of
+identical positions share one stored board.
 """
+import random
+
+EMPTY = "-"
+_zobrist_rng = random.Random(0x5EED)
+_zobrist_keys = {}  # (row, col, piece) -> key, filled on first use (same for every game)
+BLACK_TO_MOVE_KEY = _zobrist_rng.getrandbits(64)
+
+
+def zobrist_key(row, col, piece):
+    key = _zobrist_keys.get((row, col, piece))
+    if key is None:
+        key = _zobrist_keys[(row, col, piece)] = _zobrist_rng.getrandbits(64)
+    return key
+
+
+def zobrist_hash(board, turn):
+    h = BLACK_TO_MOVE_KEY if turn == "Black" else 0
+    for r, row in enumerate(board):
+        for c, piece in enumerate(row):
+            if piece != EMPTY:
+                h ^= zobrist_key(r, c, piece)
+    return h
+
 
 # Memento - stores the chess board state
 class ChessMemento:
-    def __init__(self, board, turn):
+    def __init__(self, board, turn, position_hash=None):
         self._board = [row.copy() for row in board]  # deep copy of 2D list
         self._turn = turn
+        self.position_hash = position_hash
 
     def get_state(self):
         return [row.copy() for row in self._board], self._turn
 
 
+# Memento - only the squares changed since the previous save (+ a full board on keyframes)
+class ChessDeltaMemento:
+    __slots__ = ("changes", "turn", "board", "position_hash")
+
+    def __init__(self, changes, turn, board=None, position_hash=None):
+        # (row, col, old, new) per changed square; None when the base state is unknown (keyframe only)
+        self.changes = changes
+        self.turn = turn
+        self.board = [row.copy() for row in board] if board is not None else None
+        self.position_hash = position_hash
+
+    def is_keyframe(self):
+        return self.board is not None
+
+    def apply(self, board):
+        for row, col, _, new in self.changes:
+            board[row][col] = new
+
+    def revert(self, board):
+        for row, col, old, _ in reversed(self.changes):
+            board[row][col] = old
+
+    def get_state(self):
+        if self.board is None:
+            raise ValueError("A delta memento can only be restored through History")
+        return [row.copy() for row in self.board], self.turn
+
+
 # Originator - Chess game whose state we want to save/restore
 class ChessGame:
-    def __init__(self, n):
+    def __init__(self, n, keyframe_every=None):
         self.n = n
         # Initialize empty board
-        self._board = [["-" for _ in range(n)] for _ in range(n)]
+        self._board = [[EMPTY for _ in range(n)] for _ in range(n)]
         self._turn = "White"
+        self._hash = 0  # Zobrist hash of the empty board, White to move
+        # delta mode: save() returns ChessDeltaMemento, with a full board every keyframe_every saves
+        self.keyframe_every = keyframe_every
+        self._changed = {}  # (row, col) -> piece there at the previous save
+        self._since_keyframe = None  # None: next delta save must be a keyframe
 
     def make_move(self, row, col, piece):
         if 0 <= row < self.n and 0 <= col < self.n:
+            old = self._board[row][col]
+            if self.keyframe_every:
+                self._changed.setdefault((row, col), old)
             self._board[row][col] = piece
+            if old != EMPTY:
+                self._hash ^= zobrist_key(row, col, old)
+            if piece != EMPTY:
+                self._hash ^= zobrist_key(row, col, piece)
             # Switch turn
             self._turn = "Black" if self._turn == "White" else "White"
+            self._hash ^= BLACK_TO_MOVE_KEY
             print(f"{piece} moved to ({row}, {col}). Turn: {self._turn}")
         else:
             print("Invalid move!")
@@ -38,11 +113,32 @@ class ChessGame:
             print(" ".join(row))
         print()
 
+    def position_hash(self):
+        return self._hash
+
     def save(self):
-        return ChessMemento(self._board, self._turn)
+        if not self.keyframe_every:
+            return ChessMemento(self._board, self._turn, self._hash)
+        changes = [(row, col, old, self._board[row][col])
+                   for (row, col), old in self._changed.items() if self._board[row][col] != old]
+        self._changed = {}
+        if self._since_keyframe is None:
+            # first save, or right after a restore: the previous memento may not be our base
+            self._since_keyframe = 0
+            return ChessDeltaMemento(None, self._turn, self._board, self._hash)
+        self._since_keyframe += 1
+        if self._since_keyframe >= self.keyframe_every:
+            self._since_keyframe = 0
+            return ChessDeltaMemento(changes, self._turn, self._board, self._hash)
+        return ChessDeltaMemento(changes, self._turn, position_hash=self._hash)
 
     def restore(self, memento):
         self._board, self._turn = memento.get_state()
+        self._hash = memento.position_hash
+        if self._hash is None:
+            self._hash = zobrist_hash(self._board, self._turn)
+        self._changed = {}
+        self._since_keyframe = None
         print("Restored board state. Turn:", self._turn)
 
 
@@ -50,14 +146,83 @@ class ChessGame:
 class History:
     def __init__(self):
         self._mementos = []
+        self._tip = None  # board at the newest delta memento
+        self._positions = {}  # position hash -> number of mementos of that position
+        self._boards = {}  # position hash -> board shared by all full mementos of that position
+
+    def occurrences(self, position_hash):
+        """How many saved positions have this hash (0 = never occurred)."""
+        return self._positions.get(position_hash, 0)
+
+    def stored_boards(self):
+        """Distinct boards held by full mementos / keyframes (after sharing)."""
+        return len(self._boards)
+
+    def _share_board(self, memento):
+        # identical positions keep one board; compared once so a hash collision cannot alias boards
+        if memento.position_hash is None:
+            return
+        if isinstance(memento, ChessDeltaMemento):
+            board = memento.board
+        else:
+            board = memento._board
+        if board is None:
+            return
+        shared = self._boards.get(memento.position_hash)
+        if shared is None:
+            self._boards[memento.position_hash] = board
+        elif shared is not board and shared == board:
+            if isinstance(memento, ChessDeltaMemento):
+                memento.board = shared
+            else:
+                memento._board = shared
 
     def add(self, memento):
+        if memento.position_hash is not None:
+            self._positions[memento.position_hash] = self._positions.get(memento.position_hash, 0) + 1
+            self._share_board(memento)
+        if isinstance(memento, ChessDeltaMemento):
+            if memento.is_keyframe():
+                self._tip = [row.copy() for row in memento.board]
+            elif self._tip is None:
+                raise ValueError("Delta history has to start with a keyframe")
+            else:
+                memento.apply(self._tip)
         self._mementos.append(memento)
 
     def undo(self):
-        if self._mementos:
-            return self._mementos.pop()
-        return None
+        if not self._mementos:
+            return None
+        memento = self._mementos.pop()
+        if memento.position_hash is not None:
+            count = self._positions[memento.position_hash] - 1
+            if count:
+                self._positions[memento.position_hash] = count
+            else:
+                del self._positions[memento.position_hash]
+                self._boards.pop(memento.position_hash, None)
+        if not isinstance(memento, ChessDeltaMemento):
+            return memento
+        state = ChessMemento(self._tip, memento.turn, memento.position_hash)
+        # move the working board back to the new newest memento
+        if not self._mementos:
+            self._tip = None
+        elif memento.changes is not None:
+            memento.revert(self._tip)
+        else:
+            self._tip = self.state_at(len(self._mementos) - 1).get_state()[0]
+        return state
+
+    def state_at(self, index):
+        """Full memento for position index: nearest keyframe at or before it + forward deltas."""
+        start = index
+        while not isinstance(self._mementos[start], ChessMemento) and not self._mementos[start].is_keyframe():
+            start -= 1
+        board, turn = self._mementos[start].get_state()
+        for memento in self._mementos[start + 1:index + 1]:
+            memento.apply(board)
+            turn = memento.turn
+        return ChessMemento(board, turn, self._mementos[index].position_hash)
 
 
 # ======== Client Code ========
@@ -92,3 +257,39 @@ if __name__ == "__main__":
     if memento:
         game.restore(memento)
         game.show_board()
+
+    # Delta mode: same history API, a fraction of the memory on a big board
+    import contextlib
+    import io
+    import random
+    import tracemalloc
+
+    def play_and_save(keyframe_every, size=64, moves=2000):
+        rng = random.Random(7)
+        long_game = ChessGame(size, keyframe_every=keyframe_every)
+        long_history = History()
+        tracemalloc.start()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(moves):
+                long_game.make_move(rng.randrange(size), rng.randrange(size), rng.choice(["WP", "BP", "WN", "BN"]))
+                long_history.add(long_game.save())
+        used = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return used
+
+    full_bytes = play_and_save(None)
+    delta_bytes = play_and_save(16)
+    print(f"64x64 board, 2000 saved moves: full mementos {full_bytes / 1e6:.1f} MB, "
+          f"delta mementos (keyframe every 16) {delta_bytes / 1e6:.1f} MB")
+
+    # Repetition: the knight goes out and back twice -> same position (same side to move) three times
+    with contextlib.redirect_stdout(io.StringIO()):
+        game = ChessGame(5)
+        history = History()
+        history.add(game.save())
+        for _ in range(2):
+            for row, col, piece in ((0, 1, "WN"), (4, 1, "BN"), (0, 1, "-"), (4, 1, "-")):
+                game.make_move(row, col, piece)
+                history.add(game.save())
+    print("Start position occurred", history.occurrences(game.position_hash()), "times;",
+          "stored boards:", history.stored_boards(), "for", len(history._mementos), "mementos")
@@ -8,8 +8,28 @@ Users can type text and save snapshots (mementos) at any point.
 Users can undo to previous snapshots or redo undone snapshots.
 
 The editor does not store commands, only states.
+
+States are structurally shared: a save stores only the text written since the previous
+save, as an immutable Segment pointing at the segment of the previous snapshot, so
+N saves cost O(total text) memory instead of O(N x size), and a restore only swaps
+the segment reference.
 '''
 
+#immutable piece of a snapshot: text written since `prev` was saved
+class Segment():
+    __slots__=("prev","text")
+    def __init__(self,prev,text):
+        self.prev=prev
+        self.text=text
+
+    def materialize(self):
+        parts=[]
+        node=self
+        while node is not None:
+            parts.append(node.text)
+            node=node.prev
+        return "".join(reversed(parts))
+
 #memento -which actually stores originality of state
 class Memento():
     def __init__(self,state):
@@ -20,27 +40,53 @@ class Memento():
 #originator - It is an object for which we want to maintain history
 class TextEditor():
     def __init__(self):
-        self._content=""
+        self._snapshot=None  # Segment of the last save / restore
+        self._pending=[]  # text written after it
+        self._content=""  # materialized text, None when stale
     
     def write(self,text):
-        self._content+=text 
+        self._pending.append(text)
+        self._content=None
     
+    @property
+    def content(self):
+        if self._content is None:
+            base=self._snapshot.materialize() if self._snapshot else ""
+            self._content=base+"".join(self._pending)
+        return self._content
+
     def show(self):
-        print(self._content)
+        print(self.content)
     def save(self):
-        return Memento(self._content)
+        if self._pending:
+            self._snapshot=Segment(self._snapshot,"".join(self._pending))
+            self._pending=[]
+        return Memento(self._snapshot)
     def restore(self,memento):
-        self._content=memento.get_state()
+        self._snapshot=memento.get_state()
+        self._pending=[]
+        self._content=None
 
 #caretaker  - stores /manages list of states
 class History():
     def __init__(self):
         self._mementos=[] 
+        self._redo=[]
     def add(self,memento):
         self._mementos.append(memento)
+        self._redo.clear()
     def undo(self):
         if self._mementos:
-            return self._mementos.pop()
+            memento=self._mementos.pop()
+            self._redo.append(memento)
+            return memento
+        return None
+    def redo(self):
+        # hands mementos back in the reverse order undo gave them out
+        if self._redo:
+            memento=self._redo.pop()
+            self._mementos.append(memento)
+            return memento
         return None
 
 
@@ -71,3 +117,14 @@ if __name__ == "__main__":
         editor.restore(memento)
     editor.show()  # Hello
 
+    # Redo mirrors undo: gives back "Hello" first, then "Hello World"
+    memento = history.redo()
+    if memento:
+        editor.restore(memento)
+    editor.show()  # Hello
+
+    memento = history.redo()
+    if memento:
+        editor.restore(memento)
+    editor.show()  # Hello World
+
@@ -0,0 +1,72 @@
+"""Benchmark: memory and time of 10k TextEditor snapshots.
+
+Types a growing document (a line per save) and keeps every snapshot in History:
+  - shared: TextEditor as is (Segment chain, a save stores only the new text)
+  - full copy: the old scheme, one complete string per memento
+Reports traced memory of the mementos, save and restore times.
+
+usage: python text_snapshot_benchmark.py [saves]
+"""
+import random
+import sys
+import time
+import tracemalloc
+
+from text_editor import History, Memento, TextEditor
+
+
+def lines(saves: int, seed: int = 11):
+    rng = random.Random(seed)
+    words = ["memento", "editor", "snapshot", "history", "undo", "redo", "segment", "text"]
+    return [" ".join(rng.choice(words) for _ in range(rng.randint(4, 12))) + "\n" for _ in range(saves)]
+
+
+def bench_shared(text_lines):
+    editor, history = TextEditor(), History()
+    tracemalloc.start()
+    started = time.perf_counter()
+    for line in text_lines:
+        editor.write(line)
+        history.add(editor.save())
+    save_seconds = time.perf_counter() - started
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    rng = random.Random(1)
+    picks = [rng.choice(history._mementos) for _ in range(1000)]
+    started = time.perf_counter()
+    for memento in picks:
+        editor.restore(memento)
+    restore_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    for memento in picks[:100]:
+        editor.restore(memento)
+        editor.content
+    read_seconds = time.perf_counter() - started
+    return memory, save_seconds, restore_seconds / len(picks), read_seconds / 100
+
+
+def bench_full_copy(text_lines):
+    history = History()
+    content = ""
+    tracemalloc.start()
+    started = time.perf_counter()
+    for line in text_lines:
+        content += line
+        history.add(Memento(content))
+    save_seconds = time.perf_counter() - started
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return memory, save_seconds
+
+
+if __name__ == "__main__":
+    saves = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    text_lines = lines(saves)
+    size = sum(map(len, text_lines))
+    full_memory, full_save = bench_full_copy(text_lines)
+    shared_memory, shared_save, restore, read = bench_shared(text_lines)
+    print(f"{saves:,} snapshots of a document growing to {size / 1e6:.2f} MB")
+    print(f"  full copy : {full_memory / 1e6:8.1f} MB  save {full_save / saves * 1e6:.2f}us")
+    print(f"  shared    : {shared_memory / 1e6:8.1f} MB  save {shared_save / saves * 1e6:.2f}us  "
+          f"restore {restore * 1e6:.2f}us  restore + read content {read * 1e3:.2f}ms")
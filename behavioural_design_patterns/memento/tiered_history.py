@@ -0,0 +1,252 @@
+'''
+Tiered caretaker for mementos: an LRU memory tier + a compressed spill file.
+
+History (in chess_game.py and text_editor.py) keeps every memento in a list, so memory
+grows without limit. TieredHistory keeps at most `max_in_memory` mementos as objects
+(least recently used are evicted first). That cap counts mementos, not bytes: mementos
+of a growing document get bigger and bigger under the same cap. `max_bytes` adds a byte
+budget on top of it, with `sizeof(memento)` (required then) as a cheap estimate of what a
+memento holds - nothing is encoded on add(). For text mementos text_memento_sizeof counts
+only the segment that save added, since older text is shared. The newest memento always
+stays in memory, however big it is. Either limit can be None. An evicted memento is encoded, compressed
+(zlib / lzma, `level` is the compression level) and appended to a local file. Reads of
+spilled mementos go through a read-only memory map and the memento moves back into the
+memory tier, so undo(), redo() and random access via get(i) work the same for both tiers.
+
+A spilled memento keeps its file copy, so evicting it again costs nothing. Entries dropped
+from the redo stack are not removed from the file; the file lives only as long as the
+history (close()).
+
+Mementos are pickled by default. Text editor mementos need text_memento_codec(), because
+their segment chains are too deep to pickle. Their segments are already shared with newer
+snapshots, so spilling them pays off mostly for histories with many restored branches;
+the chess mementos (a full board each) are the main use.
+'''
+import lzma
+import mmap
+import os
+import pickle
+import tempfile
+import time
+import zlib
+from collections import OrderedDict
+
+from text_editor import Memento, Segment
+
+COMPRESSORS = {
+    "zlib": (lambda data, level: zlib.compress(data, level), zlib.decompress),
+    "lzma": (lambda data, level: lzma.compress(data, preset=level), lzma.decompress),
+    None: (lambda data, level: data, lambda data: data),
+}
+
+
+def text_memento_sizeof(memento):
+    """Bytes a text editor memento adds: its newest segment (older ones are shared)."""
+    segment = memento.get_state()
+    return len(segment.text) if segment else 0
+
+
+def text_memento_codec():
+    """(encode, decode) for text_editor mementos: stores the materialized text."""
+    def encode(memento):
+        segment = memento.get_state()
+        return (segment.materialize() if segment else "").encode("utf-8")
+
+    def decode(data):
+        text = data.decode("utf-8")
+        return Memento(Segment(None, text) if text else None)
+
+    return encode, decode
+
+
+class TieredHistory:
+    def __init__(self, max_in_memory=256, compression="zlib", level=6, path=None,
+                 encode=pickle.dumps, decode=pickle.loads, max_bytes=None, sizeof=None):
+        if compression not in COMPRESSORS:
+            raise ValueError(f"Unknown compression {compression!r}")
+        if max_in_memory is None and max_bytes is None:
+            raise ValueError("TieredHistory needs max_in_memory or max_bytes")
+        if max_bytes is not None and sizeof is None:
+            # measuring by encoding would cost O(memento) on every add()
+            raise ValueError("max_bytes needs a sizeof(memento) estimate")
+        self.max_in_memory = max_in_memory
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._sizes = {}  # entry id -> size of a memento in the memory tier (only with max_bytes)
+        self.hot_bytes = 0
+        self.level = level
+        self._compress, self._decompress = COMPRESSORS[compression]
+        self._encode, self._decode = encode, decode
+        self._mementos = []  # entry ids, oldest first (undo pops the last)
+        self._redo = []
+        self._hot = OrderedDict()  # entry id -> memento, least recently used first
+        self._cold = {}  # entry id -> (offset, length) in the spill file
+        self._next_id = 0
+        self._owns_file = path is None
+        if path is None:
+            fd, path = tempfile.mkstemp(suffix=".mementos")
+            os.close(fd)
+        self.path = path
+        self._file = open(path, "w+b")
+        self._mm = None
+        self._mapped = 0
+        self.stats = {"hot_hits": 0, "cold_hits": 0, "spilled": 0, "raw_bytes": 0,
+                      "spilled_bytes": 0, "cold_seconds": 0.0, "cold_max_seconds": 0.0}
+
+    def __len__(self):
+        return len(self._mementos)
+
+    def add(self, memento):
+        for entry in self._redo:
+            self._hot.pop(entry, None)
+            self.hot_bytes -= self._sizes.pop(entry, 0)
+            self._cold.pop(entry, None)
+        self._redo.clear()
+        entry = self._next_id
+        self._next_id += 1
+        self._mementos.append(entry)
+        self._hot[entry] = memento
+        if self.max_bytes is not None:
+            self._track(entry, self._sizeof(memento))
+        self._evict()
+
+    def undo(self):
+        if not self._mementos:
+            return None
+        entry = self._mementos.pop()
+        self._redo.append(entry)
+        return self._fetch(entry)
+
+    def redo(self):
+        # hands mementos back in the reverse order undo gave them out
+        if not self._redo:
+            return None
+        entry = self._redo.pop()
+        self._mementos.append(entry)
+        return self._fetch(entry)
+
+    def get(self, index):
+        """Random access: index 0 is the oldest memento still in the history."""
+        return self._fetch(self._mementos[index])
+
+    def hit_rate(self):
+        hits = self.stats["hot_hits"]
+        total = hits + self.stats["cold_hits"]
+        return hits / total if total else 1.0
+
+    def _fetch(self, entry):
+        memento = self._hot.get(entry)
+        if memento is not None:
+            self._hot.move_to_end(entry)
+            self.stats["hot_hits"] += 1
+            return memento
+        started = time.perf_counter()
+        offset, length = self._cold[entry]
+        if offset + length > self._mapped:
+            self._remap()
+        raw = self._decompress(self._mm[offset:offset + length])
+        memento = self._decode(raw)
+        self._hot[entry] = memento
+        if self.max_bytes is not None:
+            self._track(entry, self._sizeof(memento))
+        self._evict()
+        elapsed = time.perf_counter() - started
+        self.stats["cold_hits"] += 1
+        self.stats["cold_seconds"] += elapsed
+        self.stats["cold_max_seconds"] = max(self.stats["cold_max_seconds"], elapsed)
+        return memento
+
+    def _track(self, entry, size):
+        self._sizes[entry] = size
+        self.hot_bytes += size
+
+    def _over_budget(self):
+        hot = self._hot
+        if self.max_in_memory is not None and len(hot) > self.max_in_memory:
+            return True
+        return self.max_bytes is not None and self.hot_bytes > self.max_bytes and len(hot) > 1
+
+    def _evict(self):
+        while self._over_budget():
+            entry, memento = self._hot.popitem(last=False)
+            self.hot_bytes -= self._sizes.pop(entry, 0)
+            if entry in self._cold:
+                continue  # already on disk
+            raw = self._encode(memento)
+            data = self._compress(raw, self.level)
+            self._file.seek(0, os.SEEK_END)
+            self._cold[entry] = (self._file.tell(), len(data))
+            self._file.write(data)
+            self.stats["spilled"] += 1
+            self.stats["raw_bytes"] += len(raw)
+            self.stats["spilled_bytes"] += len(data)
+
+    def _remap(self):
+        self._file.flush()
+        if self._mm is not None:
+            self._mm.close()
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._mapped = len(self._mm)
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+        if self._owns_file:
+            os.remove(self.path)
+
+
+# ======== Client Code ========
+if __name__ == "__main__":
+    import contextlib
+    import io
+    import random
+    from chess_game import ChessGame
+    from text_editor import TextEditor
+
+    def report(name, history, seconds):
+        stats = history.stats
+        cold = stats["cold_hits"]
+        print(f"{name}: {seconds:.2f}s  in memory {len(history._hot)}"
+              + (f" ({history.hot_bytes / 1e6:.1f} MB)" if history.max_bytes else "") + f"  spilled {stats['spilled']} "
+              f"({stats['raw_bytes'] / 1e6:.1f} MB -> {stats['spilled_bytes'] / 1e6:.1f} MB)  "
+              f"hit rate {history.hit_rate():.1%}  cold restore avg "
+              f"{stats['cold_seconds'] / max(1, cold) * 1e6:.0f}us max {stats['cold_max_seconds'] * 1e6:.0f}us")
+
+    # chess: 2000 full mementos of a 32x32 board, 64 kept in memory, then undo everything
+    rng = random.Random(3)
+    game = ChessGame(32)
+    history = TieredHistory(max_in_memory=64)
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(2000):
+            game.make_move(rng.randrange(32), rng.randrange(32), rng.choice(["WP", "BP", "WN", "BN"]))
+            history.add(game.save())
+        expected = history.get(1000).get_state()
+        while len(history) > 1:
+            game.restore(history.undo())
+        for _ in range(1000):
+            history.redo()
+        assert history.get(len(history) - 1).get_state() == expected
+    report("chess (zlib)", history, time.perf_counter() - started)
+    history.close()
+
+    # text editor: 2000 snapshots, lzma, random access restores. Saved mementos cost only their
+    # new segment, but one restored from disk holds the whole document, so the 100 memento cap
+    # gets a 1 MB byte budget on top of it.
+    editor = TextEditor()
+    encode, decode = text_memento_codec()
+    history = TieredHistory(max_in_memory=100, max_bytes=1_000_000, sizeof=text_memento_sizeof,
+                            compression="lzma", level=1, encode=encode, decode=decode)
+    started = time.perf_counter()
+    for i in range(2000):
+        editor.write(f"line {i}: the quick brown fox jumps over the lazy dog\n")
+        history.add(editor.save())
+    for _ in range(500):
+        index = rng.randrange(len(history))
+        editor.restore(history.get(index))
+        assert editor.content.count("\n") == index + 1
+    assert history.hot_bytes <= history.max_bytes or len(history._hot) == 1
+    report("text  (lzma)", history, time.perf_counter() - started)
+    history.close()